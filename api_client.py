@@ -0,0 +1,78 @@
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+# Set to the API's base URL (e.g. http://127.0.0.1:8600) to run the app as a thin client
+API_URL = os.environ.get("SMARTCAST_API_URL", "")
+API_TOKEN = os.environ.get("SMARTCAST_API_TOKEN", "")
+
+
+class JobFailedError(RuntimeError):
+    """Raised when a job submitted to the API fails on its worker."""
+
+
+class ApiClient:
+    """Minimal client for api_server.py: submit jobs, poll their status, fetch results."""
+
+    def __init__(self, base_url: str = API_URL, timeout: float = 30.0, token: str = API_TOKEN):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 content_type: Optional[str] = None):
+        request = Request(self.base_url + path, data=body, method=method)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+    def submit(self, kind: str, params: Optional[Dict] = None, payload: Optional[bytes] = None) -> str:
+        """Queue a job and return its id; raw `payload` bytes go in the body, params in the query."""
+        params = params or {}
+        if payload is not None:
+            path = f"/jobs/{kind}?{urlencode(params)}"
+            status, body = self._request("POST", path, payload, "application/octet-stream")
+        else:
+            status, body = self._request("POST", f"/jobs/{kind}", json.dumps(params).encode("utf-8"),
+                                         "application/json")
+        if status != 202:
+            raise RuntimeError(f"Job submission failed ({status}): {body.get('error')}")
+        return body["id"]
+
+    def status(self, job_id: str) -> Dict:
+        return self._request("GET", f"/jobs/{job_id}")[1]
+
+    def result(self, job_id: str):
+        """Result of a finished job, or None while it is still queued or running."""
+        status, body = self._request("GET", f"/jobs/{job_id}/result")
+        if status == 200:
+            return body["result"]
+        if status == 202:
+            return None
+        raise JobFailedError(body.get("error") or f"HTTP {status}")
+
+    def run(self, kind: str, params: Optional[Dict] = None, payload: Optional[bytes] = None,
+            poll_seconds: float = 1.0, on_status: Optional[Callable[[Dict], None]] = None,
+            timeout: Optional[float] = None):
+        """Submit a job and poll until it finishes; returns its result."""
+        job_id = self.submit(kind, params, payload)
+        started = time.monotonic()
+        while True:
+            result = self.result(job_id)
+            if result is not None:
+                return result
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds")
+            if on_status:
+                on_status(self.status(job_id))
+            time.sleep(poll_seconds)
@@ -0,0 +1,174 @@
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from job_queue import JobQueue, QUEUE_PATH
+from job_worker import HANDLERS, WorkerPool, default_worker_count, paper_source, parse_flag
+
+MAX_BODY_BYTES = int(os.environ.get("SMARTCAST_API_MAX_BODY_MB", "100")) * 1024 * 1024
+
+# Shared secret clients send as "Authorization: Bearer <token>"; required unless the API only listens on loopback
+API_TOKEN = os.environ.get("SMARTCAST_API_TOKEN", "")
+
+_JOB_RE = re.compile(r'^/jobs/([0-9a-f]{32})(/result)?$')
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """HTTP front end of the job queue.
+
+    POST /jobs/<kind>          submit a job; JSON parameters in the body, or raw
+                               input bytes (PDF/audio) with parameters in the query
+    GET  /jobs/<id>            job status
+    GET  /jobs/<id>/result     result of a finished job (202 while it is running)
+    GET  /health               queue counts and live workers
+    """
+    server_version = "SmartCastAPI/1.0"
+    queue: JobQueue = None
+    pool: Optional[WorkerPool] = None
+    token: str = ""
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        header = self.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")):
+            return True
+        self._send(401, {"error": "missing or invalid API token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        path = urlsplit(self.path).path
+        if path == "/health":
+            workers = self.pool.alive() if self.pool else None
+            return self._send(200, {"jobs": self.queue.stats(), "workers": workers})
+
+        match = _JOB_RE.match(path)
+        if not match:
+            return self._send(404, {"error": "not found"})
+        job = self.queue.status(match.group(1))
+        if job is None:
+            return self._send(404, {"error": "unknown job"})
+        if not match.group(2):
+            return self._send(200, job)
+
+        if job["status"] == "done":
+            return self._send(200, {"id": job["id"], "status": "done", "result": self.queue.result(job["id"])})
+        if job["status"] == "failed":
+            return self._send(500, {"id": job["id"], "status": "failed", "error": job["error"]})
+        return self._send(202, {"id": job["id"], "status": job["status"]})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        kind = url.path[len("/jobs/"):] if url.path.startswith("/jobs/") else None
+        if kind not in HANDLERS:
+            return self._send(404, {"error": f"unknown job kind: {kind}", "kinds": sorted(HANDLERS)})
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            return self._send(400, {"error": "invalid Content-Length"})
+        if length > MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot be reused
+            self.close_connection = True
+            return self._send(413, {"error": "request body too large"})
+        body = self.rfile.read(length) if length else b""
+
+        params = dict(parse_qsl(url.query))
+        payload = None
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                fields = json.loads(body or b"{}")
+            except ValueError:
+                return self._send(400, {"error": "invalid JSON body"})
+            if not isinstance(fields, dict):
+                return self._send(400, {"error": "JSON body must be an object of job parameters"})
+            params.update(fields)
+        elif body:
+            payload = body
+
+        # Refreshing is how to run a job, not what it computes, so it stays out of the dedupe key
+        refresh = parse_flag(params.pop("refresh", False))
+        if kind == "paper":
+            try:
+                source = paper_source(params, payload)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            if payload is None:
+                params["source"] = source
+        job_id = self.queue.submit(kind, params, payload, refresh=refresh)
+        self._send(202, {"id": job_id, "status": self.queue.status(job_id)["status"]})
+
+    def log_message(self, format, *args):
+        pass  # polling would flood the console
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(address: str = "127.0.0.1:8600", queue_path: str = QUEUE_PATH, workers: int = 1,
+          preload: tuple = (), token: str = API_TOKEN):
+    """Serve the job API and, unless `workers` is 0, run a pool of worker processes beside it.
+
+    When `token` is set every request must carry it; listening on anything
+    but loopback without a token is refused.
+    """
+    host, port = address.rsplit(":", 1)
+    if not token and not _is_loopback(host):
+        raise SystemExit(f"Refusing to listen on {address} without an API token; set SMARTCAST_API_TOKEN")
+    ApiHandler.token = token
+    ApiHandler.queue = JobQueue(queue_path)
+    pool = None
+    if workers:
+        pool = ApiHandler.pool = WorkerPool(workers, queue_path, preload)
+        pool.start()
+
+    server = ThreadingHTTPServer((host, int(port)), ApiHandler)
+    print(f"SmartCast API listening on http://{address} with {workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool:
+            pool.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP job API for paper processing, podcasts and transcription")
+    parser.add_argument("--address", default="127.0.0.1:8600")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="worker processes to run here (0 = API only; start workers with job_worker.py)")
+    parser.add_argument("--preload", default="", help="models each worker loads at startup, e.g. whisper,bart")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="job queue database")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    serve(args.address, args.queue, args.workers, tuple(m for m in args.preload.split(",") if m))
@@ -2,17 +2,23 @@ import os
 os.environ["TRANSFORMERS_NO_TF"] = "1"
 
 import streamlit as st
-from transcribe import transcribe_audio, download_youtube_audio
-from summarize import summarize_text
-from speak import speak_summary
-from keywords import extract_keywords, analyze_sentiment
-from translate import translate_text
-from paper_processor import process_paper_input
-from podcast_generator import create_podcast_from_paper
-from transformers import pipeline
+from summarize import SUMMARY_ENGINES
+from paper_document import PaperDocument
+from paper_library import get_library
+from deadline import Deadline
+from artifacts import JobScratch, pdf_bytes
+from inference_gate import run_inference, InferenceBusyError
+from single_flight import flights, job_key
+from api_client import API_URL, ApiClient, JobFailedError
+import base64
 import json
+import uuid
+from types import SimpleNamespace
 from fpdf import FPDF
 
+# Model code (whisper, transformers, PyMuPDF, gTTS) is imported only where a job runs in this
+# process, so with SMARTCAST_API_URL set the app stays a thin client
+
 st.set_page_config(page_title="SmartCast Digestor", layout="wide")
 st.title("🎙️ SmartCast Digestor")
 
@@ -20,107 +26,248 @@ st.title("🎙️ SmartCast Digestor")
 mode = st.radio("Choose input source:", ["Upload audio file", "YouTube link", "Scientific Paper"])
 
 audio_path = None
+audio_source = None
 transcript = None
 paper_data = None
 
+# Models are shared by all sessions; their calls are queued fairly per session
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+def gated(model, fn, *args, **kwargs):
+    """Run a model call through the shared admission queue, showing the queue position while waiting."""
+    status = st.empty()
+
+    def show_position(position):
+        status.info(f"⏳ Waiting for the {model} model: position {position} in queue")
+
+    try:
+        return run_inference(model, fn, *args, session_id=st.session_state.session_id,
+                             on_wait=show_position, **kwargs)
+    except InferenceBusyError as e:
+        status.empty()
+        st.warning(f"{e}.")
+        st.stop()
+    finally:
+        status.empty()
+
+def coalesced(key, fn, *args, **kwargs):
+    """Run `fn` once for all sessions submitting the same job at the same time."""
+    if flights.in_flight(key):
+        st.caption("Joining an identical job that is already running...")
+    return flights.do(key, fn, *args, **kwargs)
+
+# With SMARTCAST_API_URL set, heavy jobs run on the API's worker processes instead of in this app
+api = ApiClient(API_URL) if API_URL else None
+
+def remote(kind, params=None, payload=None):
+    """Run a job on the API service, showing its queue status while polling."""
+    status = st.empty()
+
+    def show_status(job):
+        if job["status"] == "queued":
+            status.info(f"⏳ Job queued: position {job.get('position', '?')}")
+        else:
+            status.info(f"⚙️ Job {job['status']} on {job.get('worker') or 'a worker'}...")
+
+    try:
+        return api.run(kind, params, payload, on_status=show_status)
+    except JobFailedError as e:
+        st.error(f"Job failed: {e}")
+        st.stop()
+    finally:
+        status.empty()
+
+def open_paper(source):
+    """Process a paper (PDF bytes or arXiv reference), locally or on the API service."""
+    if api:
+        params = {} if isinstance(source, bytes) else {"source": source}
+        result = remote("paper", params, source if isinstance(source, bytes) else None)
+        return PaperDocument.from_bytes(base64.b64decode(result["document"]))
+    from paper_processor import process_paper_input
+    return coalesced(job_key("paper", source), process_paper_input, source)
+
+def ask(context, question):
+    """Answer a question about `context`, locally or on the API service."""
+    if api:
+        return remote("qa", {"context": context, "question": question})
+    from batching import answer_question
+    return gated("qa", answer_question, context, question)
+
+def audio_in_languages(text, langs, style=None):
+    """Translate and synthesize `text` in all selected languages at once."""
+    if not langs:
+        return {}
+    with st.spinner(f"Rendering audio in {len(langs)} language(s)..."):
+        if api:
+            result = remote("speech", {"text": text, "langs": langs, "style": style or ""})
+            return {lang: base64.b64decode(result["audio"][lang]) if lang in result["audio"]
+                    else RuntimeError(result["errors"].get(lang, "no audio returned"))
+                    for lang in langs}
+        from language_fanout import fan_out
+        return fan_out(text, langs, style=style, session_id=st.session_state.session_id)
+
 if mode == "Upload audio file":
     uploaded = st.file_uploader("Upload your podcast (.mp3 or .wav)", type=["mp3", "wav"])
     if uploaded:
-        with open("temp_audio.wav", "wb") as f:
-            f.write(uploaded.read())
-        audio_path = "temp_audio.wav"
+        audio_source = uploaded.getvalue()
+        audio_path = uploaded.name  # written to a scratch file only while it is analyzed here
 
 elif mode == "YouTube link":
     youtube_url = st.text_input("Paste a YouTube video link (English speech works best)")
     if youtube_url:
-        st.info("Downloading audio from YouTube...")
-        audio_path = download_youtube_audio(youtube_url)
-        st.success("Audio downloaded.")
+        if not api:
+            st.info("Downloading audio from YouTube...")
+        # Cached by video ID and decoded once to 16 kHz PCM for whisper
+        audio_source = youtube_url
+        if api:
+            audio_path = youtube_url  # the worker downloads it
+        else:
+            from transcribe import download_youtube_audio
+            audio_path = coalesced(job_key("youtube_audio", youtube_url), download_youtube_audio,
+                                   youtube_url, mode="pcm")
+            st.success("Audio downloaded.")
 
 elif mode == "Scientific Paper":
     st.markdown("### 📄 Scientific Paper Processing")
     
-    paper_input_type = st.radio("Choose paper input method:", ["Upload PDF", "arXiv URL/ID"])
+    paper_input_type = st.radio("Choose paper input method:", ["Upload PDF", "arXiv URL/ID", "Paper Library"])
     
     if paper_input_type == "Upload PDF":
         uploaded_pdf = st.file_uploader("Upload scientific paper (PDF)", type=["pdf"])
         if uploaded_pdf:
-            with open("temp_paper.pdf", "wb") as f:
-                f.write(uploaded_pdf.read())
-            
             with st.spinner("Processing scientific paper..."):
                 try:
-                    text, paper_data = process_paper_input("temp_paper.pdf")
+                    pdf_data = uploaded_pdf.getvalue()
+                    paper_data = open_paper(pdf_data)
                     st.success("Paper processed successfully!")
                     
                     # Display paper metadata
-                    if paper_data['metadata'].get('title'):
-                        st.markdown(f"**Paper Title:** {paper_data['metadata']['title']}")
-                    if paper_data['metadata'].get('year'):
-                        st.markdown(f"**Year:** {paper_data['metadata']['year']}")
-                    if paper_data['metadata'].get('doi'):
-                        st.markdown(f"**DOI:** {paper_data['metadata']['doi']}")
+                    if paper_data.metadata.get('title'):
+                        st.markdown(f"**Paper Title:** {paper_data.metadata['title']}")
+                    if paper_data.metadata.get('year'):
+                        st.markdown(f"**Year:** {paper_data.metadata['year']}")
+                    if paper_data.metadata.get('doi'):
+                        st.markdown(f"**DOI:** {paper_data.metadata['doi']}")
                     
                 except Exception as e:
                     st.error(f"Error processing paper: {str(e)}")
     
+    elif paper_input_type == "Paper Library":
+        library = get_library()
+        library_query = st.text_input("Search your processed papers (leave empty to browse recent ones)")
+        if library_query:
+            hits = library.search(library_query)
+            choices = {}
+            for hit in hits:
+                choices.setdefault(hit['paper_id'], f"{hit['title'] or 'Untitled'} ({hit['year'] or 'n.d.'})")
+            for hit in hits[:5]:
+                st.markdown(f"- *{hit['title'] or 'Untitled'}* ({hit['name']}): {hit['snippet']}")
+        else:
+            choices = {
+                paper['id']: f"{paper['title'] or 'Untitled'} ({paper['year'] or 'n.d.'})"
+                for paper in library.list_papers()
+            }
+        
+        if choices:
+            paper_id = st.selectbox("Open paper:", list(choices), format_func=choices.get)
+            paper_data = library.load_paper(paper_id)
+            
+            past_podcasts = library.list_podcasts(paper_id)
+            if past_podcasts:
+                with st.expander(f"🎧 Previous podcasts ({len(past_podcasts)})"):
+                    for podcast in past_podcasts:
+                        st.markdown(f"**{podcast['style'].title()}** - {podcast['metadata']['episode_title']}")
+                        st.text_area("Script", podcast['script'], height=150, key=f"past_podcast_{podcast['id']}")
+        else:
+            st.info("No matching papers in your library yet.")
+    
     else:  # arXiv URL/ID
         arxiv_input = st.text_input("Enter arXiv URL or ID (e.g., https://arxiv.org/abs/2103.12345 or 2103.12345)")
         if arxiv_input:
             with st.spinner("Downloading and processing arXiv paper..."):
                 try:
-                    text, paper_data = process_paper_input(arxiv_input)
+                    paper_data = open_paper(arxiv_input)
                     st.success("Paper processed successfully!")
                     
                     # Display paper metadata
-                    if paper_data['metadata'].get('title'):
-                        st.markdown(f"**Paper Title:** {paper_data['metadata']['title']}")
-                    if paper_data['metadata'].get('year'):
-                        st.markdown(f"**Year:** {paper_data['metadata']['year']}")
-                    if paper_data['metadata'].get('doi'):
-                        st.markdown(f"**DOI:** {paper_data['metadata']['doi']}")
+                    if paper_data.metadata.get('title'):
+                        st.markdown(f"**Paper Title:** {paper_data.metadata['title']}")
+                    if paper_data.metadata.get('year'):
+                        st.markdown(f"**Year:** {paper_data.metadata['year']}")
+                    if paper_data.metadata.get('doi'):
+                        st.markdown(f"**DOI:** {paper_data.metadata['doi']}")
                     
                 except Exception as e:
                     st.error(f"Error processing arXiv paper: {str(e)}")
 
 # Proceed if audio is ready
 if audio_path:
-    st.info("Transcribing...")
-    transcript = transcribe_audio(audio_path)
+    summary_engine = st.selectbox(
+        "Summary engine:", SUMMARY_ENGINES,
+        format_func=lambda x: {
+            "abstractive": "Abstractive (BART, higher quality)",
+            "extractive": "Extractive (TextRank, near-instant)"
+        }.get(x, x)
+    )
+
+    # Transcription, chunk summaries and per-segment sentiment run as overlapping stages
+    progress = st.progress(0.0, text="Transcribing and summarizing...")
+    counts = {"windows": 0, "total": 1, "chunks": 0}
+
+    def show_pipeline(kind, update):
+        counts.update(update)
+        progress.progress(counts["windows"] / counts["total"],
+                          text=f"Transcribed {counts['windows']} of {counts['total']} windows, "
+                               f"summarized {counts['chunks']} chunks")
+
+    try:
+        if api:
+            if isinstance(audio_source, bytes):
+                params, payload = {"engine": summary_engine, "filename": os.path.basename(audio_path)}, audio_source
+            else:
+                params, payload = {"engine": summary_engine, "url": audio_source}, None
+            analysis = SimpleNamespace(**remote("audio", params, payload))
+        else:
+            from audio_pipeline import run_audio_pipeline
+            # Scratch space for whisper, which needs a real file path; removed even if the run is stopped
+            with JobScratch() as job:
+                local_path = job.write(audio_path, audio_source) if isinstance(audio_source, bytes) else audio_path
+                analysis = coalesced(job_key("audio", audio_source, engine=summary_engine), run_audio_pipeline,
+                                     local_path, summary_engine, st.session_state.session_id, show_pipeline)
+    except InferenceBusyError as e:
+        st.warning(f"{e}.")
+        st.stop()
+    finally:
+        progress.empty()
+
+    transcript = analysis.transcript
+    summary = analysis.summary
+    keywords = analysis.keywords
+    sentiment = analysis.sentiment
+
     st.text_area("Transcript", transcript, height=200)
 
-    st.info("Summarizing...")
-    summary = summarize_text(transcript)
     st.success("Summary:")
     st.write(summary)
 
-    keywords = extract_keywords(summary)
     st.markdown("**Keywords:**")
     st.write(", ".join(keywords))
 
-    sentiment = analyze_sentiment(summary)
     st.markdown("**Sentiment Analysis:**")
     st.json(sentiment)
+    if len(analysis.segment_sentiment) > 1:
+        st.markdown("**Sentiment over time:**")
+        st.line_chart(analysis.segment_sentiment)
 
     st.markdown("---")
     st.markdown("### ❓ Ask a Question About the Transcript")
 
-    if "qa_pipeline" not in st.session_state:
-        with st.spinner("Loading upgraded QA model..."):
-            st.session_state.qa_pipeline = pipeline(
-                "question-answering",
-                model="deepset/xlm-roberta-base-squad2",
-                tokenizer="deepset/xlm-roberta-base-squad2"
-            )
-
     question = st.text_input("Ask your question:")
     if question:
         with st.spinner("Thinking..."):
             try:
-                result = st.session_state.qa_pipeline({
-                    "context": transcript,
-                    "question": question
-                })
+                result = ask(transcript, question)
                 st.success("Answer:")
                 st.write(result["answer"])
             except Exception as e:
@@ -140,23 +287,21 @@ if audio_path:
         }.get(x, x)
     )
 
+    audio_by_lang = audio_in_languages(summary, voice_langs)
     for lang in voice_langs:
         st.markdown(f"### 🔊 Audio Summary in {lang.upper()}")
-        if lang in ["hi", "fr", "es"]:
-            translated_summary = translate_text(summary, src_lang="en", tgt_lang=lang)
-        else:
-            translated_summary = summary
-
-        audio_file = speak_summary(translated_summary, lang=lang)
-        st.audio(audio_file)
+        audio_bytes = audio_by_lang[lang]
+        if isinstance(audio_bytes, Exception):
+            st.error(f"Could not render {lang.upper()} audio: {audio_bytes}")
+            continue
+        st.audio(audio_bytes, format="audio/mpeg")
 
-        with open(audio_file, "rb") as f:
-            st.download_button(
-                label=f"Download {lang.upper()} Audio",
-                data=f,
-                file_name=f"summary_{lang}.mp3",
-                mime="audio/mpeg"
-            )
+        st.download_button(
+            label=f"Download {lang.upper()} Audio",
+            data=audio_bytes,
+            file_name=f"summary_{lang}.mp3",
+            mime="audio/mpeg"
+        )
 
     st.markdown("---")
     st.markdown("### 📥 Download Summary")
@@ -177,10 +322,7 @@ if audio_path:
     pdf.multi_cell(0, 10, "Summary:\n" + summary + "\n\n")
     pdf.multi_cell(0, 10, "Keywords:\n" + ", ".join(keywords) + "\n\n")
     pdf.multi_cell(0, 10, f"Sentiment:\n{sentiment}\n\n")
-    pdf.output("summary.pdf")
-
-    with open("summary.pdf", "rb") as f:
-        st.download_button("Download PDF", f, "summary.pdf", "application/pdf")
+    st.download_button("Download PDF", pdf_bytes(pdf), "summary.pdf", "application/pdf")
 
 # Process scientific paper input (new functionality)
 elif paper_data:
@@ -189,16 +331,16 @@ elif paper_data:
     
     # Display extracted sections
     with st.expander("📖 Paper Sections"):
-        sections = paper_data['sections']
+        sections = paper_data.sections
         for section_name, content in sections.items():
             if content.strip():
                 st.markdown(f"**{section_name.title()}:**")
                 st.text_area(f"{section_name.title()} Content", content, height=150, key=f"section_{section_name}")
     
     # Display key findings
-    if paper_data['findings']:
+    if paper_data.findings:
         st.markdown("### 🔍 Key Findings")
-        for i, finding in enumerate(paper_data['findings'], 1):
+        for i, finding in enumerate(paper_data.findings, 1):
             st.markdown(f"**{i}.** {finding}")
     
     st.markdown("---")
@@ -216,10 +358,43 @@ elif paper_data:
         }.get(x, x)
     )
     
+    podcast_engine = st.selectbox(
+        "Section summaries:", SUMMARY_ENGINES,
+        format_func=lambda x: {
+            "abstractive": "Abstractive (BART, higher quality)",
+            "extractive": "Extractive (TextRank, near-instant)"
+        }.get(x, x),
+        key="podcast_engine"
+    )
+    
+    time_budget = st.slider(
+        "Time budget for script generation (seconds, 0 = no limit):",
+        min_value=0, max_value=600, value=0, step=30
+    )
+    
     if st.button("🎙️ Generate Podcast Script"):
         with st.spinner("Generating podcast script..."):
+            # The budget starts now, so waiting for the summarizer counts against it
+            deadline = Deadline(time_budget) if time_budget else None
             try:
-                podcast_result = create_podcast_from_paper(paper_data, podcast_style)
+                if api:
+                    podcast_result = remote(
+                        "podcast", {"style": podcast_style, "engine": podcast_engine,
+                                    "deadline_seconds": time_budget or ""},
+                        paper_data.to_bytes()
+                    )
+                else:
+                    from podcast_generator import create_podcast_from_paper
+                    podcast_result = coalesced(
+                        job_key("podcast", paper_data.source_key or paper_data.text.encode(),
+                                style=podcast_style, budget=time_budget, engine=podcast_engine),
+                        gated, "bart", create_podcast_from_paper, paper_data, podcast_style,
+                        deadline=deadline, engine=podcast_engine
+                    )
+                
+                if podcast_result['degradations']:
+                    st.warning("To meet the time budget the script was shortened: "
+                               + "; ".join(podcast_result['degradations']))
                 
                 st.markdown("### 📝 Generated Podcast Script")
                 st.text_area("Podcast Script", podcast_result['script'], height=400)
@@ -252,25 +427,22 @@ elif paper_data:
                     }.get(x, x)
                 )
                 
+                audio_by_lang = audio_in_languages(podcast_result['script'], voice_langs, podcast_style)
                 for lang in voice_langs:
                     st.markdown(f"### 🔊 Podcast Audio in {lang.upper()}")
                     
-                    # For non-English languages, translate the script
-                    if lang in ["hi", "fr", "es"]:
-                        translated_script = translate_text(podcast_result['script'], src_lang="en", tgt_lang=lang)
-                    else:
-                        translated_script = podcast_result['script']
+                    audio_bytes = audio_by_lang[lang]
+                    if isinstance(audio_bytes, Exception):
+                        st.error(f"Could not render {lang.upper()} audio: {audio_bytes}")
+                        continue
+                    st.audio(audio_bytes, format="audio/mpeg")
                     
-                    audio_file = speak_summary(translated_script, lang=lang)
-                    st.audio(audio_file)
-                    
-                    with open(audio_file, "rb") as f:
-                        st.download_button(
-                            label=f"Download {lang.upper()} Podcast",
-                            data=f,
-                            file_name=f"podcast_{podcast_style}_{lang}.mp3",
-                            mime="audio/mpeg"
-                        )
+                    st.download_button(
+                        label=f"Download {lang.upper()} Podcast",
+                        data=audio_bytes,
+                        file_name=f"podcast_{podcast_style}_{lang}.mp3",
+                        mime="audio/mpeg"
+                    )
                 
                 # Download options
                 st.markdown("---")
@@ -289,8 +461,8 @@ elif paper_data:
                     "script": podcast_result['script'],
                     "metadata": podcast_result['metadata'],
                     "style": podcast_style,
-                    "paper_metadata": paper_data['metadata'],
-                    "key_findings": paper_data['findings']
+                    "paper_metadata": paper_data.metadata,
+                    "key_findings": list(paper_data.findings)
                 }
                 
                 st.download_button(
@@ -313,15 +485,12 @@ elif paper_data:
                 pdf.multi_cell(0, 10, f"Year: {metadata['paper_year']}\n")
                 if metadata['paper_doi']:
                     pdf.multi_cell(0, 10, f"DOI: {metadata['paper_doi']}\n")
-                pdf.output("podcast_script.pdf")
-                
-                with open("podcast_script.pdf", "rb") as f:
-                    st.download_button(
-                        "Download Script (PDF)",
-                        f,
-                        file_name=f"podcast_script_{podcast_style}.pdf",
-                        mime="application/pdf"
-                    )
+                st.download_button(
+                    "Download Script (PDF)",
+                    pdf_bytes(pdf),
+                    file_name=f"podcast_script_{podcast_style}.pdf",
+                    mime="application/pdf"
+                )
                 
             except Exception as e:
                 st.error(f"Error generating podcast: {str(e)}")
@@ -330,22 +499,11 @@ elif paper_data:
     st.markdown("---")
     st.markdown("### ❓ Ask Questions About the Paper")
     
-    if "qa_pipeline" not in st.session_state:
-        with st.spinner("Loading QA model..."):
-            st.session_state.qa_pipeline = pipeline(
-                "question-answering",
-                model="deepset/xlm-roberta-base-squad2",
-                tokenizer="deepset/xlm-roberta-base-squad2"
-            )
-    
     question = st.text_input("Ask a question about the paper:")
     if question:
         with st.spinner("Analyzing..."):
             try:
-                result = st.session_state.qa_pipeline({
-                    "context": paper_data['full_text'],
-                    "question": question
-                })
+                result = ask(paper_data.text, question)
                 st.success("Answer:")
                 st.write(result["answer"])
             except Exception as e:
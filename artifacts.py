@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+
+class JobScratch:
+    """Private scratch directory for a single job.
+
+    Artifacts normally stay in memory; this is only for libraries (whisper,
+    yt-dlp) that insist on a real file path. Each job gets its own directory,
+    so concurrent sessions never overwrite each other's files.
+    """
+
+    def __init__(self, prefix: str = "smartcast-"):
+        self._tmp = tempfile.TemporaryDirectory(prefix=prefix)
+        self.path = self._tmp.name
+
+    def file(self, name: str) -> str:
+        """Return a path for `name` inside this job's directory."""
+        return os.path.join(self.path, os.path.basename(name))
+
+    def write(self, name: str, data: bytes) -> str:
+        """Write `data` to the scratch directory and return its path."""
+        path = self.file(name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def cleanup(self):
+        self._tmp.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def pdf_bytes(pdf) -> bytes:
+    """Render an FPDF document straight to bytes instead of a file."""
+    out = pdf.output(dest="S")
+    # PyFPDF returns a latin-1 str, fpdf2 returns a bytearray
+    if isinstance(out, str):
+        return out.encode("latin-1")
+    return bytes(out)
@@ -0,0 +1,193 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from batching import summarize_batched
+from inference_gate import run_inference
+from keywords import analyze_sentiment, extract_keywords
+from summarize import CHUNK_CHARS, SUMMARY_OPTIONS
+from text_analysis import TextAnalysis
+from textrank import summarize_extractive
+from transcribe import WINDOW_SECONDS, iter_windows, load_samples, transcribe_window
+
+QUEUE_SIZE = 4
+# Summarization calls in flight at once; the batcher merges their chunks into shared forward passes
+SUMMARY_CALLS = 2
+_DONE = object()
+
+
+@dataclass
+class AudioAnalysis:
+    """Everything the audio path of the app shows for one recording."""
+    transcript: str
+    summary: str
+    keywords: List[str]
+    sentiment: Dict[str, float]
+    # Compound VADER score of each transcribed window, in order
+    segment_sentiment: List[float] = field(default_factory=list)
+
+
+class AudioPipeline:
+    """Transcribe, summarize and analyze a recording as overlapping stages on separate threads.
+
+    Every model call goes through the admission gate under `session_id`, one window or chunk at a time.
+    """
+
+    def __init__(self, audio_path, engine: str = "abstractive", session_id: str = "default",
+                 window_seconds: float = WINDOW_SECONDS, queue_size: int = QUEUE_SIZE):
+        self.audio_path = audio_path
+        self.engine = engine
+        self.session_id = session_id
+        self.window_seconds = window_seconds
+        self._segments_for_summary = queue.Queue(maxsize=queue_size)
+        self._segments_for_analysis = queue.Queue(maxsize=queue_size)
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._windows: List[str] = []
+        self._chunk_summaries: List[str] = []
+        self._summary_calls: List[Future] = []
+        self._chunks_done = 0
+        self._chunks_lock = threading.Lock()
+        self._segment_sentiment: List[float] = []
+
+    def run(self, on_event: Optional[Callable[[str, dict], None]] = None) -> AudioAnalysis:
+        """Run the pipeline; `on_event(kind, progress)` is called from this thread as stages advance."""
+        workers = [
+            threading.Thread(target=self._stage, args=(self._transcribe,), name="pipeline-transcribe", daemon=True),
+            threading.Thread(target=self._stage, args=(self._summarize,), name="pipeline-summarize", daemon=True),
+            threading.Thread(target=self._stage, args=(self._analyze,), name="pipeline-analyze", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            finished = 0
+            while finished < len(workers):
+                kind, payload = self._events.get()
+                if kind == "error":
+                    raise payload
+                if kind == "finished":
+                    finished += 1
+                elif on_event:
+                    on_event(kind, payload)
+        finally:
+            # Also reached when the caller is interrupted; workers stop at their next step
+            self._stop.set()
+
+        return self._reduce()
+
+    def _stage(self, target):
+        try:
+            target()
+        except Exception as e:
+            self._stop.set()
+            self._events.put(("error", e))
+        else:
+            self._events.put(("finished", None))
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Put with back-pressure; gives up once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _transcribe(self):
+        windows = list(iter_windows(load_samples(self.audio_path), self.window_seconds))
+        prompt = None
+        for window, keep_from, keep_until in windows:
+            if self._stop.is_set():
+                return
+            text = run_inference("whisper", transcribe_window, window, prompt, keep_from, keep_until,
+                                 session_id=self.session_id)
+            self._windows.append(text)
+            prompt = text[-200:] or None
+            if not (self._put(self._segments_for_summary, text) and self._put(self._segments_for_analysis, text)):
+                return
+            self._events.put(("transcribed", {"windows": len(self._windows), "total": len(windows)}))
+        self._put(self._segments_for_summary, _DONE)
+        self._put(self._segments_for_analysis, _DONE)
+
+    def _summarize(self):
+        pool = ThreadPoolExecutor(max_workers=SUMMARY_CALLS, thread_name_prefix="pipeline-bart")
+        try:
+            buffer = ""
+            while True:
+                text = self._get(self._segments_for_summary)
+                if text is _DONE:
+                    break
+                buffer = f"{buffer} {text}".strip()
+                # Everything but the last chunk is complete; the last may end mid-sentence
+                chunks = TextAnalysis(buffer).sentences().chunks(CHUNK_CHARS)
+                self._submit_chunks(pool, [chunk.text for chunk in chunks[:-1]])
+                buffer = chunks[-1].text if chunks else ""
+            if buffer and not self._stop.is_set():
+                self._submit_chunks(pool, [buffer])
+            # Calls finish in any order; summaries are joined in transcript order
+            for call in self._summary_calls:
+                if self._stop.is_set():
+                    break
+                self._chunk_summaries.extend(call.result())
+        finally:
+            for call in self._summary_calls:
+                call.cancel()
+            pool.shutdown(wait=False)
+
+    def _submit_chunks(self, pool: ThreadPoolExecutor, texts: List[str]):
+        if self.engine == "extractive" or not texts:
+            return  # TextRank runs over the whole transcript in the reduce step
+        call = pool.submit(run_inference, "bart", summarize_batched, texts, session_id=self.session_id,
+                           **SUMMARY_OPTIONS)
+        call.add_done_callback(lambda done: self._chunks_summarized(len(texts), done))
+        self._summary_calls.append(call)
+
+    def _chunks_summarized(self, count: int, call: Future):
+        if call.cancelled() or call.exception() is not None:
+            return
+        with self._chunks_lock:
+            self._chunks_done += count
+            done = self._chunks_done
+        self._events.put(("summarized", {"chunks": done}))
+
+    def _analyze(self):
+        analyzer = SentimentIntensityAnalyzer()
+        while True:
+            text = self._get(self._segments_for_analysis)
+            if text is _DONE:
+                break
+            self._segment_sentiment.append(analyzer.polarity_scores(text)["compound"])
+
+    def _reduce(self) -> AudioAnalysis:
+        transcript = " ".join(self._windows).strip()
+        if self.engine == "extractive":
+            summary = summarize_extractive(transcript)
+        else:
+            summary = " ".join(self._chunk_summaries).strip()
+        return AudioAnalysis(
+            transcript=transcript,
+            summary=summary,
+            keywords=extract_keywords(summary),
+            sentiment=analyze_sentiment(summary),
+            segment_sentiment=list(self._segment_sentiment),
+        )
+
+
+def run_audio_pipeline(audio_path, engine: str = "abstractive", session_id: str = "default",
+                       on_event: Optional[Callable[[str, dict], None]] = None) -> AudioAnalysis:
+    """Transcribe and digest a recording with overlapping stages (see AudioPipeline)."""
+    return AudioPipeline(audio_path, engine, session_id).run(on_event)
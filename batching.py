@@ -0,0 +1,246 @@
+import argparse
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional
+
+from cpu_scheduler import configure_process, parse_cores
+from models import get_qa, get_summarizer
+
+MAX_BATCH_SIZE = int(os.environ.get("SMARTCAST_BATCH_SIZE", "8"))
+MAX_WAIT_MS = float(os.environ.get("SMARTCAST_BATCH_WAIT_MS", "15"))
+
+# Set to "host:port" to send batched inference to a shared server process
+INFERENCE_SERVER = os.environ.get("SMARTCAST_INFERENCE_SERVER", "")
+# The server unpickles what it receives, so clients must share its secret key:
+# SMARTCAST_INFERENCE_KEY, or a key file the server creates readable only by its user
+AUTH_KEY_PATH = os.environ.get(
+    "SMARTCAST_INFERENCE_KEY_FILE",
+    os.path.join(os.path.expanduser("~"), ".smartcast", "inference.key"),
+)
+
+
+def load_auth_key(create: bool = False, path: str = AUTH_KEY_PATH) -> bytes:
+    """Secret key of the batching server; with `create`, generate the key file if there is none."""
+    key = os.environ.get("SMARTCAST_INFERENCE_KEY")
+    if key:
+        return key.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        key = b""
+    if key:
+        return key
+    if not create:
+        raise RuntimeError(
+            f"No inference server key: set SMARTCAST_INFERENCE_KEY or share the server's key file ({path})"
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    key = secrets.token_hex(32).encode("ascii")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class MicroBatcher:
+    """Collect requests from every thread into micro-batches for one model.
+
+    A worker thread takes the first waiting request, keeps collecting until
+    `max_batch_size` requests are queued or `max_wait_ms` has passed, then
+    runs them through `run_batch(items, options)` as one padded forward pass.
+    Requests are only batched with others that use the same options.
+    """
+
+    def __init__(self, run_batch: Callable[[List, Dict], List], max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, name: str = "batcher"):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item, **options) -> Future:
+        future = Future()
+        self._queue.put((item, options, future))
+        return future
+
+    def map(self, items: List, **options) -> List:
+        """Submit several items and wait for all of their results, in order."""
+        futures = [self.submit(item, **options) for item in items]
+        return [future.result() for future in futures]
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Only requests with identical generation options share a forward pass
+            groups: Dict[tuple, list] = {}
+            for request in batch:
+                groups.setdefault(tuple(sorted(request[1].items())), []).append(request)
+            for requests in groups.values():
+                self._run(requests)
+
+    def _run(self, requests):
+        requests = [r for r in requests if r[2].set_running_or_notify_cancel()]
+        if not requests:
+            return
+        try:
+            results = self.run_batch([item for item, _, _ in requests], requests[0][1])
+        except Exception as e:
+            if len(requests) == 1:
+                requests[0][2].set_exception(e)
+                return
+            # One bad input should not fail its whole batch: retry item by item
+            for request in requests:
+                self._run_one(request)
+            return
+        for (_, _, future), result in zip(requests, results):
+            future.set_result(result)
+
+    def _run_one(self, request):
+        item, options, future = request
+        try:
+            future.set_result(self.run_batch([item], options)[0])
+        except Exception as e:
+            future.set_exception(e)
+
+
+def _summarize_batch(texts: List[str], options: Dict) -> List[str]:
+    options = dict(options)
+    options.setdefault("do_sample", False)
+    results = get_summarizer()(texts, batch_size=len(texts), truncation=True, **options)
+    return [result["summary_text"] for result in results]
+
+
+def _answer_batch(items: List[Dict], options: Dict) -> List[Dict]:
+    results = get_qa()(
+        question=[item["question"] for item in items],
+        context=[item["context"] for item in items],
+        batch_size=len(items),
+        **options
+    )
+    # The pipeline unwraps single-item batches
+    return results if isinstance(results, list) else [results]
+
+
+BATCH_FUNCTIONS = {
+    "summarize": _summarize_batch,
+    "qa": _answer_batch,
+}
+
+
+class RemoteBatcher:
+    """Client for a batching server started with `python batching.py`; same interface as MicroBatcher."""
+
+    def __init__(self, name: str, address: str = INFERENCE_SERVER, authkey: Optional[bytes] = None,
+                 max_workers: int = 16):
+        host, port = address.rsplit(":", 1)
+        self.name = name
+        self.address = (host, int(port))
+        self.authkey = authkey or load_auth_key()
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"remote-{name}")
+
+    def _connection(self):
+        # Connections are not thread-safe, so each client thread keeps its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        return conn
+
+    def _call(self, item, options):
+        conn = self._connection()
+        conn.send((self.name, item, options))
+        ok, value = conn.recv()
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def submit(self, item, **options) -> Future:
+        return self._pool.submit(self._call, item, options)
+
+    def map(self, items: List, **options) -> List:
+        futures = [self.submit(item, **options) for item in items]
+        return [future.result() for future in futures]
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(name: str):
+    """Shared batcher for `name` ("summarize" or "qa"), local or remote depending on configuration."""
+    with _batchers_lock:
+        if name not in _batchers:
+            if INFERENCE_SERVER:
+                _batchers[name] = RemoteBatcher(name)
+            else:
+                _batchers[name] = MicroBatcher(BATCH_FUNCTIONS[name], name=f"batch-{name}")
+        return _batchers[name]
+
+
+def summarize_batched(texts: List[str], **options) -> List[str]:
+    """Summarize texts through the shared batcher, micro-batched with other callers."""
+    return get_batcher("summarize").map(texts, **options)
+
+
+def answer_question(context: str, question: str, **options) -> Dict:
+    """Answer a question through the shared QA batcher."""
+    return get_batcher("qa").submit({"context": context, "question": question}, **options).result()
+
+
+def _serve_connection(conn, batchers):
+    with conn:
+        while True:
+            try:
+                name, item, options = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                result = batchers[name].submit(item, **options).result()
+                conn.send((True, result))
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+def serve(address: str = "127.0.0.1:6100", authkey: Optional[bytes] = None,
+          batchers: Optional[Dict[str, MicroBatcher]] = None):
+    """Serve micro-batched inference to other processes over a local socket.
+
+    Without an explicit `authkey`, the key comes from SMARTCAST_INFERENCE_KEY
+    or the key file, which is generated on first start.
+    """
+    authkey = authkey or load_auth_key(create=True)
+    host, port = address.rsplit(":", 1)
+    batchers = batchers or {name: MicroBatcher(fn, name=f"batch-{name}") for name, fn in BATCH_FUNCTIONS.items()}
+    with Listener((host, int(port)), authkey=authkey) as listener:
+        print(f"Batching inference server listening on {address}")
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_serve_connection, args=(conn, batchers), daemon=True).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batching inference server for the summarizer and QA models")
+    parser.add_argument("--address", default="127.0.0.1:6100")
+    parser.add_argument("--cores", help="pin the server to these cores, e.g. 0-3 or 0,2,4")
+    args = parser.parse_args()
+    if args.cores:
+        configure_process(parse_cores(args.cores))
+    serve(args.address)
@@ -0,0 +1,228 @@
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Result of the last auto-tune run; override the location with SMARTCAST_CPU_TUNING
+TUNING_PATH = os.environ.get(
+    "SMARTCAST_CPU_TUNING",
+    os.path.join(os.path.expanduser("~"), ".smartcast", "cpu_tuning.json"),
+)
+
+_BENCHMARK_TEXT = (
+    "Large language models are trained on vast corpora of text and can be adapted to many tasks. "
+    "In this study we measure how the number of CPU threads given to each model call affects "
+    "throughput when several calls run at the same time on one machine. We found that splitting "
+    "the cores between independent workers is often faster than giving every call all of them, "
+    "because the intra-op parallelism of a single forward pass stops scaling after a few threads. "
+) * 3
+
+
+def available_cores() -> List[int]:
+    """IDs of the cores this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def parse_cores(spec: str) -> List[int]:
+    """Parse a core list such as "0-3,6" into [0, 1, 2, 3, 6]."""
+    cores = []
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cores.extend(range(int(first), int(last) + 1))
+        elif part.strip():
+            cores.append(int(part))
+    return cores
+
+
+def worker_cores(index: int, workers: int, cores: Optional[Sequence[int]] = None) -> List[int]:
+    """Disjoint slice of `cores` for worker `index` of `workers` (the first slices get any remainder)."""
+    cores = list(cores if cores is not None else available_cores())
+    workers = max(1, min(workers, len(cores)))
+    base, extra = divmod(len(cores), workers)
+    start = index * base + min(index, extra)
+    return cores[start:start + base + (1 if index < extra else 0)]
+
+
+def _set_torch_threads(threads: int, interop: Optional[int] = None):
+    import torch
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+    if interop is not None:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            pass  # can only be set before the first inter-op task runs
+
+
+_configured_threads: Optional[int] = None
+_configure_lock = threading.Lock()
+
+
+def configure_process(cores: Optional[Sequence[int]] = None, threads: Optional[int] = None,
+                      interop: int = 1):
+    """Pin the current process to `cores` and size torch's thread pools to match.
+
+    Call this first thing in a worker process, before any model is loaded.
+    """
+    global _configured_threads
+    if cores is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    threads = threads or len(cores or available_cores())
+    # OpenMP/MKL read these when torch is first imported
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    _set_torch_threads(threads, interop)
+    _configured_threads = threads
+
+
+def ensure_configured() -> int:
+    """Size torch's thread pools once for this process, unless configure_process already did.
+
+    PyTorch's intra-op pool is shared by every thread of the process,
+    including the micro-batcher threads that run the forward passes, so it
+    is sized once rather than per call: to the tuned threads per worker when
+    `python cpu_scheduler.py` has been run, otherwise to every core. Called
+    by the model loaders; returns the thread count.
+    """
+    global _configured_threads
+    with _configure_lock:
+        if _configured_threads is None:
+            threads = load_tuning().get("threads") or len(available_cores())
+            os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+            os.environ.setdefault("MKL_NUM_THREADS", str(threads))
+            try:
+                _set_torch_threads(threads)
+            except ImportError:
+                pass
+            _configured_threads = threads
+        return _configured_threads
+
+
+def load_tuning(path: str = TUNING_PATH) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_tuning(result: Dict, path: str = TUNING_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+
+
+def _matmul_workload() -> Callable[[], None]:
+    import torch
+    a = torch.randn(512, 512)
+    b = torch.randn(512, 512)
+    return lambda: torch.mm(a, b)
+
+
+def _bart_workload() -> Callable[[], None]:
+    from models import get_summarizer
+    summarizer = get_summarizer()
+    return lambda: summarizer(_BENCHMARK_TEXT, max_length=60, min_length=15, do_sample=False)
+
+
+WORKLOADS = {
+    "matmul": _matmul_workload,
+    "bart": _bart_workload,
+}
+
+# Approximate resident memory of one worker running each workload (bart-large-cnn in fp32 plus runtime)
+WORKLOAD_MEMORY = {
+    "matmul": 64 * 1024 ** 2,
+    "bart": int(2.5 * 1024 ** 3),
+}
+
+
+def available_memory() -> Optional[int]:
+    """Bytes of physical memory currently available, or None where it cannot be read."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _benchmark_worker(workload: str, cores: List[int], threads: int, seconds: float, results):
+    configure_process(cores, threads)
+    step = WORKLOADS[workload]()
+    step()  # warm-up
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        step()
+        calls += 1
+    results.put(calls / (time.perf_counter() - started))
+
+
+def candidate_splits(n_cores: int, max_workers: Optional[int] = None) -> List[Dict[str, int]]:
+    """(workers, threads per worker) splits that use every core without oversubscribing.
+
+    `max_workers` caps the worker count, e.g. by how many model copies fit in memory.
+    """
+    limit = max(1, min(n_cores, max_workers or n_cores))
+    return [{"workers": workers, "threads": n_cores // workers}
+            for workers in range(1, limit + 1) if n_cores % workers == 0]
+
+
+def autotune(workload: str = "matmul", seconds: float = 5.0, cores: Optional[Sequence[int]] = None,
+             save: bool = True) -> Dict:
+    """Benchmark each worker/thread split of the cores and pick the highest throughput.
+
+    Every worker is a separate process pinned to its own slice of the cores
+    and holding its own copy of the model, so splits with more workers than
+    fit in the available memory are not tried. The best split is written to
+    TUNING_PATH, where the model loaders and worker pools read it.
+    """
+    cores = list(cores if cores is not None else available_cores())
+    memory = available_memory()
+    max_workers = max(1, memory // WORKLOAD_MEMORY[workload]) if memory else None
+    context = multiprocessing.get_context("spawn")
+    measurements = []
+    for split in candidate_splits(len(cores), max_workers):
+        results = context.Queue()
+        processes = [
+            context.Process(target=_benchmark_worker,
+                            args=(workload, worker_cores(i, split["workers"], cores), split["threads"],
+                                  seconds, results))
+            for i in range(split["workers"])
+        ]
+        for process in processes:
+            process.start()
+        # Generous timeout: each worker loads its model before the timed run
+        throughput = sum(results.get(timeout=seconds + 600) for _ in processes)
+        for process in processes:
+            process.join()
+        measurements.append(dict(split, throughput=round(throughput, 3)))
+        print(f"{split['workers']} worker(s) x {split['threads']} thread(s): {throughput:.2f} calls/s")
+
+    best = max(measurements, key=lambda m: m["throughput"])
+    result = dict(best, workload=workload, cores=len(cores), measurements=measurements)
+    if save:
+        save_tuning(result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auto-tune the worker/thread split of this machine's cores")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="matmul")
+    parser.add_argument("--seconds", type=float, default=5.0, help="benchmark time per split")
+    args = parser.parse_args()
+    best = autotune(args.workload, args.seconds)
+    print(f"Best: {best['workers']} worker(s) x {best['threads']} thread(s), saved to {TUNING_PATH}")
@@ -0,0 +1,108 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+# Sections a podcast can drop entirely when it is running late
+OPTIONAL_SECTIONS = ('discussion',)
+
+FULL_MAX_LENGTH = 150
+FULL_MIN_LENGTH = 30
+SHORT_MAX_LENGTH = 60
+SHORT_MIN_LENGTH = 15
+
+
+class Deadline:
+    """Wall-clock time budget for one job.
+
+    Start it when the request is accepted, so time spent queueing for a
+    model counts against the budget too.
+    """
+
+    def __init__(self, seconds: float, started: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic() if started is None else started
+
+    @classmethod
+    def since(cls, seconds: float, accepted_at: float) -> "Deadline":
+        """Budget of a request accepted at `accepted_at` (a time.time() timestamp, e.g. a job's created_at)."""
+        return cls(seconds, time.monotonic() - max(0.0, time.time() - accepted_at))
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.seconds - self.elapsed()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+@dataclass
+class SummaryPlan:
+    """How to summarize one section under the current budget."""
+    max_chunks: Optional[int] = None   # None keeps every chunk
+    max_length: int = FULL_MAX_LENGTH
+    min_length: int = FULL_MIN_LENGTH
+    skip: bool = False                 # leave the section out of the script
+    lead_only: bool = False            # use leading sentences, no model call
+
+
+class DegradationPolicy:
+    """Split a job's deadline across its summarization stages and degrade step by step.
+
+    Each stage gets an equal share of the time left. If the estimated cost of
+    a full summary does not fit, the policy first keeps fewer chunks, then
+    shortens max_length, then skips optional sections, and finally falls back
+    to the leading sentences. Every step taken is recorded in `degradations`.
+    Costs are estimated from the observed seconds per generated token.
+    """
+
+    def __init__(self, deadline: Optional[Deadline], seconds_per_token: float = 0.03):
+        self.deadline = deadline
+        self.seconds_per_token = seconds_per_token
+        self.degradations: List[str] = []
+        self._stages_left = 0
+
+    def begin(self, stages: Iterable[str]):
+        """Declare the summarization stages the job is about to run."""
+        self._stages_left = len(list(stages))
+
+    def plan(self, section_type: str, n_chunks: int) -> SummaryPlan:
+        stages_left = max(1, self._stages_left)
+        self._stages_left = max(0, self._stages_left - 1)
+        if self.deadline is None:
+            return SummaryPlan()
+
+        budget = self.deadline.remaining() / stages_left
+        full_chunk = FULL_MAX_LENGTH * self.seconds_per_token
+        short_chunk = SHORT_MAX_LENGTH * self.seconds_per_token
+
+        if n_chunks * full_chunk <= budget:
+            return SummaryPlan()
+
+        fit = int(budget // full_chunk)
+        if fit >= 1:
+            self._record(f"{section_type}: summarized {fit} of {n_chunks} chunks")
+            return SummaryPlan(max_chunks=fit)
+
+        fit = int(budget // short_chunk)
+        if fit >= 1:
+            self._record(f"{section_type}: shortened summary ({SHORT_MAX_LENGTH} tokens, "
+                         f"{min(fit, n_chunks)} of {n_chunks} chunks)")
+            return SummaryPlan(max_chunks=fit, max_length=SHORT_MAX_LENGTH, min_length=SHORT_MIN_LENGTH)
+
+        if section_type in OPTIONAL_SECTIONS:
+            self._record(f"{section_type}: skipped")
+            return SummaryPlan(skip=True)
+
+        self._record(f"{section_type}: used leading sentences")
+        return SummaryPlan(lead_only=True)
+
+    def observe(self, seconds: float, n_chunks: int, max_length: int):
+        """Update the cost estimate from a finished model call."""
+        tokens = max(1, n_chunks * max_length)
+        self.seconds_per_token = 0.5 * self.seconds_per_token + 0.5 * (seconds / tokens)
+
+    def _record(self, message: str):
+        if message not in self.degradations:
+            self.degradations.append(message)
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# Concurrent executions allowed per model; override with e.g. SMARTCAST_MODEL_LIMITS="whisper=2,bart=1"
+DEFAULT_LIMITS = {"whisper": 1, "bart": 2, "marian": 2, "qa": 2}
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_MAX_PER_SESSION = 4
+
+
+class InferenceBusyError(RuntimeError):
+    """Raised when a model queue is full or a request waited longer than allowed."""
+
+
+class _Ticket:
+    __slots__ = ("session_id", "granted")
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.granted = False
+
+
+class ModelGate:
+    """Admission control for one model.
+
+    At most `limit` calls run at once. Waiting calls are queued per session
+    and sessions are served round-robin, so one session submitting many
+    requests cannot starve the others. Queues are bounded in total and per
+    session; beyond that callers get InferenceBusyError instead of piling up.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int = DEFAULT_MAX_QUEUE,
+                 max_per_session: int = DEFAULT_MAX_PER_SESSION):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_per_session = max_per_session
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._queues: Dict[str, deque] = {}
+        self._rotation = deque()
+
+    def acquire(self, session_id: str, on_wait: Optional[Callable[[int], None]] = None,
+                timeout: Optional[float] = None) -> _Ticket:
+        """Block until a slot is free; `on_wait(position)` is called whenever the queue position changes."""
+        ticket = _Ticket(session_id)
+        with self._cond:
+            queue = self._queues.get(session_id)
+            if self._waiting >= self.max_queue or (queue and len(queue) >= self.max_per_session):
+                raise InferenceBusyError(f"The {self.name} model is busy, please try again shortly")
+            if queue is None:
+                queue = self._queues[session_id] = deque()
+                self._rotation.append(session_id)
+            queue.append(ticket)
+            self._waiting += 1
+            self._dispatch()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reported = None
+        try:
+            while True:
+                with self._cond:
+                    if not ticket.granted and reported is not None:
+                        self._cond.wait(0.5)
+                    if ticket.granted:
+                        return ticket
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise InferenceBusyError(f"Timed out waiting for the {self.name} model")
+                    position = self._position(ticket)
+
+                # Report outside the lock; the callback may do slow UI work
+                if position != reported:
+                    reported = position
+                    if on_wait is not None:
+                        on_wait(position)
+        except BaseException:
+            # Timeout, or the callback was interrupted (e.g. a Streamlit rerun): give the slot back
+            # if it was granted meanwhile, otherwise leave the queue so it is never granted
+            with self._cond:
+                granted = ticket.granted
+                if not granted:
+                    self._withdraw(ticket)
+            if granted:
+                self.release()
+            raise
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, session_id: str, on_wait: Optional[Callable[[int], None]] = None,
+             timeout: Optional[float] = None):
+        self.acquire(session_id, on_wait, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"active": self._active, "waiting": self._waiting, "limit": self.limit}
+
+    def _dispatch(self):
+        granted = False
+        while self._active < self.limit and self._rotation:
+            session_id = self._rotation.popleft()
+            queue = self._queues[session_id]
+            queue.popleft().granted = True
+            self._active += 1
+            self._waiting -= 1
+            granted = True
+            if queue:
+                self._rotation.append(session_id)
+            else:
+                del self._queues[session_id]
+        if granted:
+            self._cond.notify_all()
+
+    def _position(self, ticket: _Ticket) -> int:
+        """1-based place of `ticket` in round-robin service order."""
+        own = self._queues[ticket.session_id]
+        k = own.index(ticket)
+        ahead = k
+        before_own = True
+        for session_id in self._rotation:
+            if session_id == ticket.session_id:
+                before_own = False
+                continue
+            ahead += min(len(self._queues[session_id]), k + (1 if before_own else 0))
+        return ahead + 1
+
+    def _withdraw(self, ticket: _Ticket):
+        queue = self._queues[ticket.session_id]
+        queue.remove(ticket)
+        self._waiting -= 1
+        if not queue:
+            del self._queues[ticket.session_id]
+            self._rotation.remove(ticket.session_id)
+
+
+def _configured_limits() -> Dict[str, int]:
+    limits = dict(DEFAULT_LIMITS)
+    for item in os.environ.get("SMARTCAST_MODEL_LIMITS", "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+class AdmissionController:
+    """Process-wide set of model gates shared by every session."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._limits = limits if limits is not None else _configured_limits()
+        self._gates: Dict[str, ModelGate] = {}
+        self._lock = threading.Lock()
+
+    def gate(self, model: str) -> ModelGate:
+        with self._lock:
+            if model not in self._gates:
+                self._gates[model] = ModelGate(model, self._limits.get(model, 1), self.max_queue)
+            return self._gates[model]
+
+    def run(self, model: str, fn: Callable, *args, session_id: str = "default",
+            on_wait: Optional[Callable[[int], None]] = None, timeout: Optional[float] = None, **kwargs):
+        """Call `fn(*args, **kwargs)` once a slot for `model` is granted to this session."""
+        with self.gate(model).slot(session_id, on_wait, timeout):
+            return fn(*args, **kwargs)
+
+
+admission = AdmissionController()
+
+
+def run_inference(model: str, fn: Callable, *args, **kwargs):
+    """Run `fn` through the shared admission controller (see AdmissionController.run)."""
+    return admission.run(model, fn, *args, **kwargs)
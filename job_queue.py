@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+QUEUE_PATH = os.environ.get(
+    "SMARTCAST_JOB_QUEUE",
+    os.path.join(os.path.expanduser("~"), ".smartcast", "jobs.db"),
+)
+
+# A running job whose lease is not renewed in time is handed to another worker
+LEASE_SECONDS = 60
+
+# Finished results are reused for identical submissions for this long
+RESULT_TTL_SECONDS = float(os.environ.get("SMARTCAST_JOB_RESULT_TTL", str(24 * 3600)))
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    payload BLOB,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs(dedupe_key);
+"""
+
+
+def dedupe_key(kind: str, params: Dict, payload: Optional[bytes] = None) -> str:
+    """Identity of a job's work: its kind, parameters and input bytes."""
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    if payload:
+        digest.update(hashlib.sha256(payload).digest())
+    return digest.hexdigest()
+
+
+class JobQueue:
+    """Persistent job queue in SQLite, shared by the API server and its workers.
+
+    Jobs survive restarts of either side. Workers claim the oldest queued job
+    under a lease that they renew while it runs; if a worker dies, its lease
+    runs out and the job is claimed again. A job identical to one that is
+    queued, running or finished within `result_ttl` seconds (same kind,
+    parameters and input) is not queued twice; the existing job id is
+    returned instead.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH, lease_seconds: float = LEASE_SECONDS, max_attempts: int = 3,
+                 result_ttl: float = RESULT_TTL_SECONDS):
+        if path == ":memory:" or path.startswith("file::memory:"):
+            # Connections are per thread, so each thread would see its own empty queue
+            raise ValueError("JobQueue needs a database file; use a temporary path instead of :memory:")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode, so claim() can take the write lock with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, kind: str, params: Optional[Dict] = None, payload: Optional[bytes] = None,
+               refresh: bool = False) -> str:
+        """Queue a job (or find the identical one already submitted) and return its id.
+
+        With `refresh`, finished results are not reused; only an identical job
+        that is still queued or running is. The flag reaches the worker as the
+        "refresh" parameter but is not part of the job's identity.
+        """
+        params = params or {}
+        key = dedupe_key(kind, params, payload)
+        if refresh:
+            params = dict(params, refresh=True)
+        # A finished job is reused only while its result is fresh, and never on refresh
+        fresh_after = float("inf") if refresh else time.time() - self.result_ttl
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND (status IN ('queued', 'running') "
+                "OR (status = 'done' AND finished_at > ?)) ORDER BY created_at DESC LIMIT 1",
+                (key, fresh_after)
+            ).fetchone()
+            if row:
+                job_id = row["id"]
+            else:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, params, payload, dedupe_key, status, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                    (job_id, kind, json.dumps(params), payload, key, time.time())
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def claim(self, worker: str, kinds: Optional[List[str]] = None) -> Optional[Dict]:
+        """Take the oldest runnable job for `worker`, or None when the queue is empty.
+
+        Runnable means queued, or running under a lease that has expired.
+        """
+        now = time.time()
+        query = "SELECT * FROM jobs WHERE (status = 'queued' OR (status = 'running' AND lease_until < ?))"
+        args: list = [now]
+        if kinds:
+            query += f" AND kind IN ({','.join('?' * len(kinds))})"
+            args.extend(kinds)
+        query += " ORDER BY created_at LIMIT 1"
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(query, args).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["attempts"] < self.max_attempts:
+                    break
+                # Crashed every worker that tried it; do not hand it out again
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, payload = NULL WHERE id = ?",
+                    (f"Gave up after {row['attempts']} attempts", now, row["id"])
+                )
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                "lease_until = ?, started_at = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend the lease of a running job; False if it no longer belongs to `worker`."""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, finished_at = ?, lease_until = NULL, payload = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (json.dumps(result), time.time(), job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_until = NULL, payload = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (error, time.time(), job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Job state without its payload or result; None for an unknown id.
+
+        A queued job's "position" counts the queued jobs of its kind up to and
+        including it, since workers may be limited to some kinds.
+        """
+        row = self._connect().execute(
+            "SELECT id, kind, status, error, worker, attempts, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job["status"] == "queued":
+            job["position"] = self._connect().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND kind = ? AND created_at <= ?",
+                (job["kind"], job["created_at"])
+            ).fetchone()[0]
+        return job
+
+    def result(self, job_id: str):
+        """Result of a finished job (None if it has not finished)."""
+        row = self._connect().execute(
+            "SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update((row["status"], row["n"]) for row in rows)
+        return counts
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
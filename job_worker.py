@@ -0,0 +1,278 @@
+import argparse
+import base64
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+from artifacts import JobScratch
+from cpu_scheduler import configure_process, load_tuning, worker_cores
+from job_queue import JobQueue, QUEUE_PATH
+from models import get_generator, get_qa, get_summarizer, get_whisper
+from source_ids import normalize_arxiv_id
+
+POLL_SECONDS = 0.5
+
+logger = logging.getLogger("smartcast.worker")
+
+# Loaders each worker can call at startup so its first job does not pay for model loading
+PRELOADERS = {
+    "whisper": lambda: get_whisper("base"),
+    "bart": get_summarizer,
+    "flan": get_generator,
+    "qa": get_qa,
+}
+
+
+def parse_flag(value) -> bool:
+    # Parameters sent in a query string arrive as strings
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _paper_result(document) -> Dict:
+    return {
+        "source_key": document.source_key,
+        "metadata": document.metadata,
+        # The whole PaperDocument, so clients can rebuild it without reprocessing the PDF
+        "document": base64.b64encode(document.to_bytes()).decode("ascii"),
+    }
+
+
+def _audio_path(job: Dict, scratch) -> str:
+    """Local audio for a job: uploaded bytes, or a YouTube link from the parameters."""
+    if job["payload"]:
+        return scratch.write(job["params"].get("filename", "upload.mp3"), job["payload"])
+    from transcribe import download_youtube_audio
+    return download_youtube_audio(job["params"]["url"], mode="pcm")
+
+
+def paper_source(params: Dict, payload: Optional[bytes]):
+    """Input of a paper job: the uploaded PDF bytes or an arXiv reference, never a path on this machine."""
+    if payload:
+        return payload
+    arxiv_id = normalize_arxiv_id(str(params.get("source", "")))
+    if not arxiv_id:
+        raise ValueError("paper jobs take an uploaded PDF or an arXiv ID/URL as 'source'")
+    return f"arXiv:{arxiv_id}"
+
+
+def run_paper(job: Dict, scratch) -> Dict:
+    from paper_processor import process_paper_input
+    source = paper_source(job["params"], job["payload"])
+    return _paper_result(process_paper_input(source, refresh=parse_flag(job["params"].get("refresh", False))))
+
+
+def run_podcast(job: Dict, scratch) -> Dict:
+    from deadline import Deadline
+    from paper_document import PaperDocument
+    from podcast_generator import create_podcast_from_paper
+    params = job["params"]
+    # The budget runs from submission, so time spent in the queue counts against it
+    seconds = params.get("deadline_seconds")
+    deadline = Deadline.since(float(seconds), job["created_at"]) if seconds else None
+    return create_podcast_from_paper(
+        PaperDocument.from_bytes(job["payload"]), params.get("style", "educational"),
+        deadline=deadline, engine=params.get("engine", "abstractive")
+    )
+
+
+def run_transcribe(job: Dict, scratch) -> Dict:
+    from transcribe import transcribe_audio
+    return {"transcript": transcribe_audio(_audio_path(job, scratch))}
+
+
+def run_summarize(job: Dict, scratch) -> Dict:
+    from summarize import summarize_text
+    params = job["params"]
+    return {"summary": summarize_text(params["text"], params.get("engine", "abstractive"))}
+
+
+def run_audio(job: Dict, scratch) -> Dict:
+    from audio_pipeline import run_audio_pipeline
+    analysis = run_audio_pipeline(_audio_path(job, scratch), job["params"].get("engine", "abstractive"),
+                                  session_id=job["id"])
+    return asdict(analysis)
+
+
+def run_qa(job: Dict, scratch) -> Dict:
+    from batching import answer_question
+    params = job["params"]
+    result = answer_question(params["context"], params["question"])
+    return {"answer": result["answer"], "score": float(result["score"])}
+
+
+def run_speech(job: Dict, scratch) -> Dict:
+    from language_fanout import fan_out
+    params = job["params"]
+    rendered = fan_out(params["text"], params["langs"], style=params.get("style") or None, session_id=job["id"])
+    # A failed language is reported beside the others, as fan_out does
+    return {
+        "audio": {lang: base64.b64encode(audio).decode("ascii")
+                  for lang, audio in rendered.items() if not isinstance(audio, Exception)},
+        "errors": {lang: str(error) for lang, error in rendered.items() if isinstance(error, Exception)},
+    }
+
+
+HANDLERS: Dict[str, Callable] = {
+    "paper": run_paper,
+    "podcast": run_podcast,
+    "transcribe": run_transcribe,
+    "summarize": run_summarize,
+    "audio": run_audio,
+    "qa": run_qa,
+    "speech": run_speech,
+}
+
+
+class LeaseLostError(RuntimeError):
+    """The job's lease expired and another worker may have claimed it."""
+
+
+class Worker:
+    """Long-lived worker process: claims jobs from the queue and runs them with warm models.
+
+    Models are loaded once (at startup with `preload`, otherwise by the first
+    job that needs them) and stay in memory for every later job. While a job
+    runs, a heartbeat thread renews its lease in the queue. If the lease is
+    lost, the job now belongs to another worker: its result is discarded and,
+    with `exit_on_lost_lease` (as in pool workers), the process exits so the
+    handler stops using CPU and the pool starts a fresh worker.
+    """
+
+    def __init__(self, queue: JobQueue, name: Optional[str] = None, kinds: Optional[List[str]] = None,
+                 exit_on_lost_lease: bool = False):
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.kinds = kinds
+        self.exit_on_lost_lease = exit_on_lost_lease
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if not self.run_once():
+                stop.wait(POLL_SECONDS)
+
+    def run_once(self) -> bool:
+        """Run the next job if there is one; returns whether a job was run."""
+        job = self.queue.claim(self.name, self.kinds)
+        if job is None:
+            return False
+
+        done = threading.Event()
+        lost = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job["id"], done, lost), daemon=True)
+        heartbeat.start()
+        try:
+            with JobScratch() as scratch:
+                result = HANDLERS[job["kind"]](job, scratch)
+            if lost.is_set():
+                raise LeaseLostError(f"lost the lease on job {job['id']}")
+        except LeaseLostError as e:
+            logger.warning("Discarding result: %s", e)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job["id"], job["kind"])
+            self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+        else:
+            self.queue.complete(job["id"], self.name, result)
+        finally:
+            done.set()
+        return True
+
+    def _heartbeat(self, job_id: str, done: threading.Event, lost: threading.Event):
+        while not done.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(job_id, self.name):
+                lost.set()
+                logger.warning("Lost the lease on job %s; another worker may be running it", job_id)
+                if self.exit_on_lost_lease:
+                    # The handler cannot be interrupted; end the process to free its cores
+                    logging.shutdown()
+                    os._exit(3)
+                return
+
+
+def worker_main(index: int, count: int, queue_path: str = QUEUE_PATH, preload: tuple = (),
+                kinds: Optional[List[str]] = None):
+    """Entry point of one worker process: pin it to its cores, warm its models, serve jobs."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    configure_process(worker_cores(index, count))
+    for model in preload:
+        PRELOADERS[model]()
+    Worker(JobQueue(queue_path), kinds=kinds, exit_on_lost_lease=True).run_forever()
+
+
+def default_worker_count() -> int:
+    """Worker processes to start: the auto-tuned split if there is one, else 1."""
+    return int(os.environ.get("SMARTCAST_WORKERS") or load_tuning().get("workers") or 1)
+
+
+class WorkerPool:
+    """Start `count` worker processes and restart any that die."""
+
+    def __init__(self, count: int, queue_path: str = QUEUE_PATH, preload: tuple = (),
+                 kinds: Optional[List[str]] = None):
+        self.count = count
+        self.queue_path = queue_path
+        self.preload = tuple(preload)
+        self.kinds = kinds
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List = [None] * count
+        self._stop = threading.Event()
+        self._monitor = None
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=worker_main, args=(index, self.count, self.queue_path, self.preload, self.kinds),
+            name=f"smartcast-worker-{index}", daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+
+    def start(self):
+        for index in range(self.count):
+            self._spawn(index)
+        self._monitor = threading.Thread(target=self._watch, name="worker-monitor", daemon=True)
+        self._monitor.start()
+
+    def _watch(self):
+        while not self._stop.wait(1.0):
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    # Its job's lease runs out and the job is claimed again by another worker
+                    logger.warning("Worker %d exited with code %s; restarting", index, process.exitcode)
+                    self._spawn(index)
+
+    def alive(self) -> int:
+        return sum(1 for process in self._processes if process is not None and process.is_alive())
+
+    def stop(self):
+        self._stop.set()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SmartCast job workers against the shared job queue")
+    parser.add_argument("--count", type=int, default=default_worker_count(), help="worker processes")
+    parser.add_argument("--preload", default="", help="models to load at startup, e.g. whisper,bart")
+    parser.add_argument("--kinds", default="", help="only run these job kinds, e.g. transcribe,audio")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="job queue database")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    pool = WorkerPool(args.count, args.queue, [m for m in args.preload.split(",") if m],
+                      [k for k in args.kinds.split(",") if k] or None)
+    pool.start()
+    logger.info("Started %d worker(s) on %s", args.count, args.queue)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
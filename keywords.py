@@ -1,11 +1,15 @@
 import yake
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from text_analysis import analyze
 
 def extract_keywords(text, max_keywords=10):
+    # Memoized on the shared analysis, so app reruns on the same text are free
+    return analyze(text).memo(("keywords", max_keywords), lambda: _extract_keywords(text, max_keywords))
+
+def _extract_keywords(text, max_keywords):
     kw_extractor = yake.KeywordExtractor()
     keywords = kw_extractor.extract_keywords(text)
     return [kw for kw, _ in keywords[:max_keywords]]
 
 def analyze_sentiment(text):
-    analyzer = SentimentIntensityAnalyzer()
-    return analyzer.polarity_scores(text)
+    return analyze(text).memo("sentiment", lambda: SentimentIntensityAnalyzer().polarity_scores(text))
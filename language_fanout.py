@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from inference_gate import run_inference
+from single_flight import flights, job_key
+from speak import parse_speaker_turns, render_turns, speak_summary
+from text_analysis import analyze
+from translate import translate_text
+
+# Languages that are translated from English before synthesis
+TRANSLATED_LANGS = ("hi", "fr", "es")
+
+MAX_LANGUAGE_WORKERS = int(os.environ.get("SMARTCAST_LANGUAGE_WORKERS", "3"))
+
+
+def _translate(text: str, lang: str, session_id: str) -> str:
+    return run_inference("marian", translate_text, text, src_lang="en", tgt_lang=lang, session_id=session_id)
+
+
+def _interview_source(script: str):
+    """Speaker turns of an interview script and the text to translate: one turn per line."""
+    turns = parse_speaker_turns(script)
+    return turns, "\n".join(turn for _, turn in turns)
+
+
+def _translate_turns(turns: List[str], lang: str) -> List[str]:
+    """Translate interview turns, one translation per turn.
+
+    All turns go through the model in one call, one per line. If the
+    translation adds or merges a line, the lines no longer line up with the
+    speakers, so each turn is translated on its own instead (mostly from
+    the translation memory, which the first attempt just filled).
+    """
+    translated = translate_text("\n".join(turns), src_lang="en", tgt_lang=lang).split("\n")
+    if len(translated) == len(turns):
+        return translated
+    return [translate_text(turn, src_lang="en", tgt_lang=lang) for turn in turns]
+
+
+def language_audio(text: str, lang: str, style: Optional[str] = None, session_id: str = "default") -> bytes:
+    """Translate (if needed) and synthesize a summary or podcast script in one language."""
+    if style == "interview":
+        # Host and guest get distinct voices; all turns are translated in one call
+        turns = parse_speaker_turns(text)
+        if lang in TRANSLATED_LANGS:
+            translated = run_inference("marian", _translate_turns, [turn for _, turn in turns], lang,
+                                       session_id=session_id)
+            turns = [(speaker, turn) for (speaker, _), turn in zip(turns, translated)]
+        return render_turns(turns, lang=lang)
+
+    if lang in TRANSLATED_LANGS:
+        text = _translate(text, lang, session_id)
+    return speak_summary(text, lang=lang)
+
+
+def fan_out(text: str, langs: Iterable[str], style: Optional[str] = None, session_id: str = "default",
+            max_workers: int = MAX_LANGUAGE_WORKERS) -> Dict[str, Union[bytes, Exception]]:
+    """Render `text` in every language concurrently; returns MP3 bytes (or the error) per language.
+
+    Languages run on a bounded pool, so the total time approaches that of
+    the slowest language. The source is segmented once and every language
+    reuses that analysis; subword tokenization stays per model, since each
+    Marian model has its own vocabulary. Identical requests from other
+    sessions are coalesced per language.
+    """
+    langs = list(dict.fromkeys(langs))
+    if not langs:
+        return {}
+    # Segment the source once up front; every language then reuses the cached analysis
+    analyze(_interview_source(text)[1] if style == "interview" else text)
+    kind = "podcast_audio" if style else "summary_audio"
+
+    def render(lang):
+        key = job_key(kind, text.encode(), style=style, lang=lang)
+        return flights.do(key, language_audio, text, lang, style, session_id)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(langs)), thread_name_prefix="fanout") as pool:
+        futures = {lang: pool.submit(render, lang) for lang in langs}
+        for lang, future in futures.items():
+            try:
+                results[lang] = future.result()
+            except Exception as e:
+                results[lang] = e
+    return results
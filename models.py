@@ -0,0 +1,68 @@
+import os
+os.environ["TRANSFORMERS_NO_TF"] = "1"
+import threading
+from functools import lru_cache
+
+from cpu_scheduler import ensure_configured
+
+TRANSLATION_MODELS = {
+    "hi": "Helsinki-NLP/opus-mt-en-hi",
+    "fr": "Helsinki-NLP/opus-mt-en-fr",
+    "es": "Helsinki-NLP/opus-mt-en-es"
+}
+
+
+def _locked(loader):
+    # Loads are serialized per loader so two sessions never load the same weights twice
+    cached = lru_cache(maxsize=None)(loader)
+    lock = threading.Lock()
+
+    def load(*args):
+        with lock:
+            # Size torch's thread pool before the first model of this process is loaded
+            ensure_configured()
+            return cached(*args)
+
+    load.__doc__ = loader.__doc__
+    load.cache_clear = cached.cache_clear
+    return load
+
+
+@_locked
+def get_whisper(size="base"):
+    """Shared whisper model."""
+    import whisper
+    return whisper.load_model(size)
+
+
+@_locked
+def get_summarizer():
+    """Shared BART summarization pipeline, used by summarize.py and the podcast generator."""
+    from transformers import pipeline
+    return pipeline("summarization", model="facebook/bart-large-cnn")
+
+
+@_locked
+def get_generator():
+    """Shared flan-t5 text2text pipeline."""
+    from transformers import pipeline
+    return pipeline("text2text-generation", model="google/flan-t5-base")
+
+
+@_locked
+def get_translator(tgt_lang):
+    """Shared Marian (tokenizer, model) pair for English to `tgt_lang`."""
+    from transformers import MarianMTModel, MarianTokenizer
+    model_name = TRANSLATION_MODELS[tgt_lang]
+    return MarianTokenizer.from_pretrained(model_name), MarianMTModel.from_pretrained(model_name)
+
+
+@_locked
+def get_qa():
+    """Shared extractive question-answering pipeline."""
+    from transformers import pipeline
+    return pipeline(
+        "question-answering",
+        model="deepset/xlm-roberta-base-squad2",
+        tokenizer="deepset/xlm-roberta-base-squad2"
+    )
@@ -0,0 +1,197 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from text_analysis import TextAnalysis, analyze
+
+SECTION_NAMES = (
+    'title', 'abstract', 'introduction', 'methods',
+    'results', 'discussion', 'conclusion', 'references'
+)
+
+_OFFSET_TYPE = 'I'  # unsigned 32-bit offsets
+_FORMAT_VERSION = 1
+
+
+def _offsets(values: Iterable[int]) -> array:
+    return array(_OFFSET_TYPE, values)
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(data: bytes) -> array:
+    arr = array(_OFFSET_TYPE)
+    arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+class TextSpans(Sequence):
+    """Read-only sequence of strings backed by (start, end) offsets into one buffer.
+
+    Strings are sliced out only when an item is accessed.
+    """
+    __slots__ = ('_text', '_offsets', '_ids')
+
+    def __init__(self, text: str, offsets: array, ids: Optional[array] = None):
+        self._text = text
+        self._offsets = offsets
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids) if self._ids is not None else len(self._offsets) // 2
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """Return the (start, end) offsets of item `index`."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if self._ids is not None:
+            index = self._ids[index]
+        return self._offsets[2 * index], self._offsets[2 * index + 1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self.span(index)
+        return self._text[start:end]
+
+    def __repr__(self) -> str:
+        return f"TextSpans({len(self)} items)"
+
+
+class SectionMap(Mapping):
+    """Mapping of section name to section text, sliced lazily from the document buffer."""
+    __slots__ = ('_text', '_offsets')
+
+    def __init__(self, text: str, offsets: array):
+        self._text = text
+        self._offsets = offsets
+
+    def span(self, name: str) -> Tuple[int, int]:
+        """Return the (start, end) offsets of section `name`; (0, 0) if it was not found."""
+        i = SECTION_NAMES.index(name)
+        return self._offsets[2 * i], self._offsets[2 * i + 1]
+
+    def __getitem__(self, name: str) -> str:
+        if name not in SECTION_NAMES:
+            raise KeyError(name)
+        start, end = self.span(name)
+        return self._text[start:end]
+
+    def __iter__(self):
+        return iter(SECTION_NAMES)
+
+    def __len__(self) -> int:
+        return len(SECTION_NAMES)
+
+
+class PaperDocument:
+    """A processed paper: one immutable text buffer plus integer offset arrays.
+
+    Sections, sentences and key findings are never stored as separate
+    strings; `sections`, `sentences` and `findings` are lazy views, so a
+    document can be handed from stage to stage without copying its text.
+    """
+    __slots__ = ('text', 'metadata', 'source_key', '_section_offsets', '_sentence_offsets', '_finding_ids',
+                 '_analysis')
+
+    def __init__(self, text: str, metadata: Dict[str, str], section_offsets: array,
+                 sentence_offsets: array, finding_ids: array, source_key: str = '',
+                 analysis: Optional[TextAnalysis] = None):
+        self.text = text
+        self.metadata = metadata
+        self.source_key = source_key
+        self._section_offsets = section_offsets
+        self._sentence_offsets = sentence_offsets
+        self._finding_ids = finding_ids
+        self._analysis = analysis
+
+    @classmethod
+    def from_spans(cls, text: str, metadata: Dict[str, str],
+                   section_spans: Dict[str, Tuple[int, int]],
+                   sentence_spans: Iterable[Tuple[int, int]],
+                   finding_ids: Iterable[int], source_key: str = '') -> 'PaperDocument':
+        """Build a document from span lists produced by the paper processor."""
+        sentence_offsets = _offsets(offset for span in sentence_spans for offset in span)
+        return cls(text, metadata, cls._section_offsets_from(section_spans), sentence_offsets,
+                   _offsets(finding_ids), source_key)
+
+    @classmethod
+    def from_analysis(cls, analysis: TextAnalysis, metadata: Dict[str, str],
+                      section_spans: Dict[str, Tuple[int, int]],
+                      finding_ids: Iterable[int], source_key: str = '') -> 'PaperDocument':
+        """Build a document that shares the segmentation (and memoized tokens) of `analysis`."""
+        return cls(analysis.text, metadata, cls._section_offsets_from(section_spans), analysis.offsets,
+                   _offsets(finding_ids), source_key, analysis)
+
+    @staticmethod
+    def _section_offsets_from(section_spans: Dict[str, Tuple[int, int]]) -> array:
+        return _offsets(offset for name in SECTION_NAMES for offset in section_spans.get(name, (0, 0)))
+
+    @property
+    def sections(self) -> SectionMap:
+        return SectionMap(self.text, self._section_offsets)
+
+    @property
+    def sentences(self) -> TextSpans:
+        return TextSpans(self.text, self._sentence_offsets)
+
+    @property
+    def findings(self) -> TextSpans:
+        return TextSpans(self.text, self._sentence_offsets, self._finding_ids)
+
+    @property
+    def analysis(self) -> TextAnalysis:
+        """Shared sentence analysis, built from the stored offsets without segmenting again."""
+        if self._analysis is None:
+            self._analysis = analyze(self.text, self._sentence_offsets)
+        return self._analysis
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact zlib-compressed binary form."""
+        header = json.dumps({
+            'version': _FORMAT_VERSION,
+            'metadata': self.metadata,
+            'source_key': self.source_key,
+            'sizes': [len(self._section_offsets), len(self._sentence_offsets), len(self._finding_ids)]
+        }).encode('utf-8')
+        body = self.text.encode('utf-8')
+        payload = b''.join([
+            struct.pack('<II', len(header), len(body)), header, body,
+            _to_le(self._section_offsets), _to_le(self._sentence_offsets), _to_le(self._finding_ids)
+        ])
+        return zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PaperDocument':
+        """Inverse of `to_bytes`."""
+        payload = memoryview(zlib.decompress(data))
+        header_len, body_len = struct.unpack_from('<II', payload)
+        pos = 8
+        header = json.loads(bytes(payload[pos:pos + header_len]))
+        pos += header_len
+        text = bytes(payload[pos:pos + body_len]).decode('utf-8')
+        pos += body_len
+
+        arrays: List[array] = []
+        width = array(_OFFSET_TYPE).itemsize
+        for size in header['sizes']:
+            arrays.append(_from_le(bytes(payload[pos:pos + size * width])))
+            pos += size * width
+        return cls(text, header['metadata'], *arrays, source_key=header.get('source_key', ''))
+
+    def __repr__(self) -> str:
+        title = self.metadata.get('title') or 'untitled'
+        return f"PaperDocument({title!r}, {len(self.text)} chars, {len(self.findings)} findings)"
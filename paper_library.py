@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from paper_document import PaperDocument, SECTION_NAMES
+
+LIBRARY_PATH = os.environ.get(
+    "SMARTCAST_LIBRARY",
+    os.path.join(os.path.expanduser("~"), ".smartcast", "library.db"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    source_key TEXT UNIQUE NOT NULL,
+    title TEXT,
+    authors TEXT,
+    year TEXT,
+    doi TEXT,
+    arxiv_id TEXT,
+    document BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    paper_id INTEGER NOT NULL REFERENCES papers(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS podcasts (
+    id INTEGER PRIMARY KEY,
+    paper_id INTEGER NOT NULL REFERENCES papers(id) ON DELETE CASCADE,
+    style TEXT NOT NULL,
+    script TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summaries_paper ON summaries(paper_id);
+CREATE INDEX IF NOT EXISTS podcasts_paper ON podcasts(paper_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    body, kind UNINDEXED, name UNINDEXED, paper_id UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def pdf_source_key(pdf_bytes: bytes) -> str:
+    """Library key for an uploaded PDF: the hash of its content."""
+    return "sha256:" + hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def arxiv_source_key(arxiv_id: str) -> str:
+    """Library key for an arXiv paper (version suffix ignored)."""
+    return "arxiv:" + re.sub(r'v\d+$', '', arxiv_id.strip())
+
+
+class PaperLibrary:
+    """Local SQLite store of processed papers, summaries and podcasts.
+
+    Papers are stored as serialized PaperDocuments, so reopening one needs no
+    PDF processing. Sections and key findings are indexed in an FTS5 table for
+    full-text search. The database runs in WAL mode, so readers in other
+    sessions are never blocked by a writer.
+
+    Each thread opens its own connection, so `path` must be a file: an
+    in-memory database would be a different, empty one in every thread.
+    """
+
+    def __init__(self, path: str = LIBRARY_PATH):
+        if path == ":memory:" or path.startswith("file::memory:"):
+            raise ValueError("PaperLibrary needs a database file; use a temporary path instead of :memory:")
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit serves each session from its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def add_paper(self, document: PaperDocument) -> int:
+        """Store a processed paper (replacing an older copy) and return its id."""
+        return self.add_papers([document])[0]
+
+    def add_papers(self, documents: Iterable[PaperDocument]) -> List[int]:
+        """Bulk-insert papers and their search passages in a single transaction.
+
+        Documents are keyed by their `source_key`; when a batch repeats a key,
+        the last document with it is stored. Returns one id per document given.
+        """
+        documents = list(documents)
+        latest: Dict[str, PaperDocument] = {}
+        for document in documents:
+            if not document.source_key:
+                raise ValueError("PaperDocument has no source_key")
+            latest[document.source_key] = document
+
+        conn = self._connect()
+        ids: Dict[str, int] = {}
+        passages = []
+        with conn:
+            for source_key, document in latest.items():
+                meta = document.metadata
+                row = (meta.get('title', ''), meta.get('authors', ''), meta.get('year', ''),
+                       meta.get('doi', ''), meta.get('arxiv_id', ''), document.to_bytes(), time.time())
+                existing = conn.execute(
+                    "SELECT id FROM papers WHERE source_key = ?", (source_key,)
+                ).fetchone()
+                if existing:
+                    # Keep the id so earlier summaries and podcasts stay attached
+                    paper_id = existing["id"]
+                    conn.execute(
+                        "UPDATE papers SET title = ?, authors = ?, year = ?, doi = ?, arxiv_id = ?, "
+                        "document = ?, created_at = ? WHERE id = ?", row + (paper_id,)
+                    )
+                else:
+                    paper_id = conn.execute(
+                        "INSERT INTO papers (title, authors, year, doi, arxiv_id, document, created_at, source_key) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row + (source_key,)
+                    ).lastrowid
+                ids[source_key] = paper_id
+
+                conn.execute("DELETE FROM passages WHERE paper_id = ?", (paper_id,))
+                sections = document.sections
+                for name in SECTION_NAMES:
+                    body = sections[name]
+                    if body.strip() and name != 'references':
+                        passages.append((body, 'section', name, paper_id))
+                for i, finding in enumerate(document.findings):
+                    passages.append((finding, 'finding', str(i), paper_id))
+                if meta.get('title'):
+                    passages.append((meta['title'], 'title', 'title', paper_id))
+
+            conn.executemany(
+                "INSERT INTO passages (body, kind, name, paper_id) VALUES (?, ?, ?, ?)", passages
+            )
+        return [ids[document.source_key] for document in documents]
+
+    def find_paper(self, source_key: str) -> Optional[int]:
+        """Return the id of a stored paper, or None."""
+        row = self._connect().execute(
+            "SELECT id FROM papers WHERE source_key = ?", (source_key,)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def load_paper(self, paper_id: int) -> PaperDocument:
+        """Reopen a stored paper without reprocessing its PDF."""
+        row = self._connect().execute(
+            "SELECT document FROM papers WHERE id = ?", (paper_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No paper with id {paper_id}")
+        return PaperDocument.from_bytes(row["document"])
+
+    def list_papers(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Most recently added papers first."""
+        rows = self._connect().execute(
+            "SELECT id, title, authors, year, doi, arxiv_id, created_at FROM papers "
+            "ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Full-text search over titles, sections and findings, best matches first."""
+        rows = self._connect().execute(
+            "SELECT p.id AS paper_id, p.title, p.year, s.kind, s.name, "
+            "snippet(passages, 0, '**', '**', ' ... ', 16) AS snippet "
+            "FROM passages AS s JOIN papers AS p ON p.id = s.paper_id "
+            "WHERE passages MATCH ? ORDER BY s.rank LIMIT ?",
+            (_fts_query(query), limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def add_summary(self, paper_id: int, kind: str, text: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO summaries (paper_id, kind, text, created_at) VALUES (?, ?, ?, ?)",
+                (paper_id, kind, text, time.time())
+            ).lastrowid
+
+    def add_podcast(self, paper_id: int, style: str, script: str, metadata: Dict) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO podcasts (paper_id, style, script, metadata, created_at) VALUES (?, ?, ?, ?, ?)",
+                (paper_id, style, script, json.dumps(metadata), time.time())
+            ).lastrowid
+
+    def list_podcasts(self, paper_id: int) -> List[Dict]:
+        rows = self._connect().execute(
+            "SELECT id, style, script, metadata, created_at FROM podcasts "
+            "WHERE paper_id = ? ORDER BY created_at DESC", (paper_id,)
+        ).fetchall()
+        return [dict(row, metadata=json.loads(row["metadata"])) for row in rows]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _fts_query(query: str) -> str:
+    """Quote each word so user input cannot break FTS5 query syntax."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms) or '""'
+
+
+_default_library = None
+_default_library_lock = threading.Lock()
+
+
+def get_library() -> PaperLibrary:
+    """Return the process-wide library at LIBRARY_PATH."""
+    global _default_library
+    with _default_library_lock:
+        if _default_library is None:
+            _default_library = PaperLibrary()
+        return _default_library
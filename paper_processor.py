@@ -5,69 +5,85 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import os
-from typing import Dict, List, Optional, Tuple
+import io
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from text_normalizer import TextNormalizer
+from paper_document import PaperDocument, SECTION_NAMES
+from text_analysis import TextAnalysis, analyze
+from paper_library import PaperLibrary, get_library, pdf_source_key, arxiv_source_key
+from source_ids import normalize_arxiv_id
+
+DOI_PATTERN = re.compile(r'\b(10\.\d{4,9}/[^\s"<>,;]+[^\s"<>,;.)\]])')
+ARXIV_ID_PATTERN = re.compile(r'arXiv:\s*(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(v\d+)?', re.IGNORECASE)
+YEAR_PATTERN = re.compile(r'\b(19[5-9]\d|20\d{2})\b')
+
+
+# Metadata titles that are really file names or tool output
+JUNK_TITLE_PATTERN = re.compile(r'(^untitled|^microsoft word|\.(pdf|docx?|tex|dvi)$)', re.IGNORECASE)
 
 class ScientificPaperProcessor:
     def __init__(self):
         self.supported_formats = ['.pdf', '.txt']
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF file using multiple methods for better results."""
-        text = ""
+    def _open_pdf(self, pdf_source: Union[str, bytes]):
+        """Open a PDF path or in-memory PDF bytes with PyMuPDF."""
+        if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+            return fitz.open(stream=bytes(pdf_source), filetype="pdf")
+        return fitz.open(pdf_source)
+    
+    def iter_pdf_pages(self, pdf_source: Union[str, bytes]) -> Iterator[str]:
+        """Yield the raw text of each page, from a PDF path or in-memory PDF bytes."""
+        produced = False
         
         # Method 1: PyMuPDF (better for complex layouts)
         try:
-            doc = fitz.open(pdf_path)
-            for page in doc:
-                text += page.get_text()
-            doc.close()
+            with self._open_pdf(pdf_source) as doc:
+                for page in doc:
+                    page_text = page.get_text()
+                    produced = produced or bool(page_text.strip())
+                    yield page_text
         except Exception as e:
             print(f"PyMuPDF failed: {e}")
         
         # Method 2: PyPDF2 (fallback)
-        if not text.strip():
+        if not produced:
             try:
-                with open(pdf_path, 'rb') as file:
+                if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+                    file = io.BytesIO(pdf_source)
+                else:
+                    file = open(pdf_source, 'rb')
+                with file:
                     pdf_reader = PyPDF2.PdfReader(file)
                     for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
+                        yield page.extract_text() or ""
             except Exception as e:
                 print(f"PyPDF2 failed: {e}")
-        
-        return text.strip()
     
-    def download_arxiv_paper(self, arxiv_id: str) -> str:
-        """Download and extract text from arXiv paper."""
+    def extract_text_from_pdf(self, pdf_source: Union[str, bytes]) -> str:
+        """Extract text from a PDF path or in-memory PDF bytes; pages are separated by form feeds."""
+        return "\f".join(self.iter_pdf_pages(pdf_source)).strip()
+    
+    def fetch_arxiv_pdf(self, arxiv_id: str) -> bytes:
+        """Download an arXiv paper's PDF into memory."""
         try:
             # Search for the paper
             search = arxiv.Search(id_list=[arxiv_id])
             paper = next(search.results())
             
-            # Download PDF
-            paper.download_pdf(filename=f"temp_{arxiv_id}.pdf")
-            
-            # Extract text
-            text = self.extract_text_from_pdf(f"temp_{arxiv_id}.pdf")
-            
-            # Clean up
-            os.remove(f"temp_{arxiv_id}.pdf")
-            
-            return text
+            # Download PDF into memory; nothing touches the working directory
+            response = requests.get(paper.pdf_url, timeout=60)
+            response.raise_for_status()
+            return response.content
         except Exception as e:
             raise Exception(f"Failed to download arXiv paper: {e}")
     
-    def extract_paper_sections(self, text: str) -> Dict[str, str]:
-        """Extract different sections of a scientific paper."""
-        sections = {
-            'title': '',
-            'abstract': '',
-            'introduction': '',
-            'methods': '',
-            'results': '',
-            'discussion': '',
-            'conclusion': '',
-            'references': ''
-        }
+    def download_arxiv_paper(self, arxiv_id: str) -> str:
+        """Download and extract text from arXiv paper."""
+        return self.extract_text_from_pdf(self.fetch_arxiv_pdf(arxiv_id))
+    
+    def find_section_spans(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """Locate the sections of a scientific paper as (start, end) offsets into `text`."""
+        spans = {}
         
         # Common section headers
         section_patterns = {
@@ -80,145 +96,277 @@ class ScientificPaperProcessor:
             'references': r'(?i)(references|bibliography|citations)'
         }
         
-        lines = text.split('\n')
         current_section = None
-        current_content = []
+        content_start = content_end = 0
         
-        for line in lines:
-            line = line.strip()
+        for match in re.finditer(r'[^\n]+', text):
+            line = match.group().strip()
             if not line:
                 continue
                 
-            # Check if this line is a section header
+            # Check if this line is a section header (short line, optional numbering)
             found_section = None
-            for section_name, pattern in section_patterns.items():
-                if re.match(pattern, line, re.IGNORECASE):
-                    found_section = section_name
-                    break
+            if len(line) <= 60 and len(line.split()) <= 6 and line[-1] not in '.!?':
+                heading = re.sub(r'^([\dIVX]+(\.\d+)*\.?)\s+', '', line)
+                for section_name, pattern in section_patterns.items():
+                    if re.match(pattern, heading, re.IGNORECASE):
+                        found_section = section_name
+                        break
             
             if found_section:
-                # Save previous section content
-                if current_section and current_content:
-                    sections[current_section] = '\n'.join(current_content)
+                # Close previous section
+                if current_section and content_end > content_start:
+                    spans[current_section] = (content_start, content_end)
                 
-                # Start new section
+                # Start new section after the header line
                 current_section = found_section
-                current_content = []
+                content_start = content_end = match.end() + 1
             elif current_section:
-                current_content.append(line)
+                content_end = match.end()
         
-        # Save last section
-        if current_section and current_content:
-            sections[current_section] = '\n'.join(current_content)
+        # Close last section
+        if current_section and content_end > content_start:
+            spans[current_section] = (content_start, content_end)
         
-        return sections
+        return spans
+    
+    def extract_paper_sections(self, text: str) -> Dict[str, str]:
+        """Extract different sections of a scientific paper."""
+        spans = self.find_section_spans(text)
+        return {name: text[slice(*spans[name])] if name in spans else '' for name in SECTION_NAMES}
     
     def clean_text(self, text: str) -> str:
-        """Clean and normalize extracted text."""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove page numbers and headers
-        text = re.sub(r'\b\d+\s*$', '', text, flags=re.MULTILINE)
+        """Clean and normalize extracted text (form feeds mark page breaks)."""
+        return TextNormalizer().normalize(text)
+    
+    def normalize_pages(self, pages: Iterable[str]) -> str:
+        """Clean a stream of pages in one pass, one heading or paragraph per line."""
+        return "\n".join(TextNormalizer().normalize_pages(pages))
+    
+    def find_sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into sentences, returned as (start, end) offsets with whitespace trimmed."""
+        analysis = analyze(text)
+        return [analysis.span(i) for i in range(len(analysis))]
+    
+    def find_key_finding_ids(self, analysis: TextAnalysis) -> List[int]:
+        """Return the indices of sentences that state key findings (at most 10)."""
+        finding_ids = []
         
-        # Remove common PDF artifacts
-        text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)\[\]]+', ' ', text)
+        # Look for sentences with key phrases
+        for i in range(len(analysis)):
+            features = analysis.features(i)
+            if features.length < 20:  # Skip very short sentences
+                continue
+            if features.finding_cue:
+                finding_ids.append(i)
+                if len(finding_ids) == 10:  # Keep top 10 findings
+                    break
         
-        return text.strip()
+        return finding_ids
     
     def extract_key_findings(self, text: str) -> List[str]:
         """Extract key findings and important statements from the paper."""
-        findings = []
+        analysis = analyze(text)
+        return [analysis.sentence(i) for i in self.find_key_finding_ids(analysis)]
+    
+    def extract_pdf_metadata(self, pdf_source: Union[str, bytes]) -> Dict[str, str]:
+        """Extract metadata cheaply from the PDF info dictionary and the first and last pages.
         
-        # Look for sentences with key phrases
-        key_phrases = [
-            r'we found',
-            r'results show',
-            r'study demonstrates',
-            r'analysis reveals',
-            r'significant',
-            r'important',
-            r'key finding',
-            r'conclusion',
-            r'implication'
-        ]
-        
-        sentences = re.split(r'[.!?]+', text)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) < 20:  # Skip very short sentences
-                continue
+        Only page one (title spans, DOI, arXiv stamp) and the last page (DOI)
+        are read, so this is available before the full text is extracted.
+        """
+        metadata = self._empty_metadata()
+        
+        try:
+            with self._open_pdf(pdf_source) as doc:
+                info = doc.metadata or {}
+                if doc.page_count == 0:
+                    return metadata
                 
-            for phrase in key_phrases:
-                if re.search(phrase, sentence, re.IGNORECASE):
-                    findings.append(sentence)
-                    break
+                first_page = doc[0]
+                first_text = first_page.get_text()
+                last_text = doc[-1].get_text() if doc.page_count > 1 else ''
+                
+                # Title: prefer the largest-font text on page one over the info dictionary,
+                # which is often empty or a file name
+                info_title = (info.get('title') or '').strip()
+                metadata['title'] = self._title_from_spans(first_page)
+                if not metadata['title'] and info_title and not JUNK_TITLE_PATTERN.search(info_title):
+                    metadata['title'] = info_title
+                
+                metadata['authors'] = (info.get('author') or '').strip()
+                
+                doi_match = DOI_PATTERN.search(first_text) or DOI_PATTERN.search(last_text) \
+                    or DOI_PATTERN.search(info.get('subject') or '')
+                if doi_match:
+                    metadata['doi'] = doi_match.group(1)
+                
+                arxiv_match = ARXIV_ID_PATTERN.search(first_text)
+                if arxiv_match:
+                    metadata['arxiv_id'] = arxiv_match.group(1)
+                
+                metadata['year'] = self._guess_year(metadata['arxiv_id'], first_text, info.get('creationDate') or '')
+        except Exception as e:
+            print(f"PyMuPDF metadata extraction failed: {e}")
         
-        return findings[:10]  # Return top 10 findings
+        return metadata
     
-    def get_paper_metadata(self, text: str) -> Dict[str, str]:
-        """Extract basic metadata from the paper."""
-        metadata = {
+    def _title_from_spans(self, page) -> str:
+        """Join the horizontal text spans set in the largest font on a page."""
+        spans = []
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                # Skip rotated text such as the arXiv side stamp
+                if tuple(round(d) for d in line.get("dir", (1, 0))) != (1, 0):
+                    continue
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if len(text) > 1 and not ARXIV_ID_PATTERN.search(text):
+                        spans.append((round(span["size"], 1), text))
+        
+        if not spans:
+            return ''
+        
+        largest = max(size for size, _ in spans)
+        title = ' '.join(text for size, text in spans if size >= largest - 0.5)
+        title = re.sub(r'\s+', ' ', title).strip()
+        return title if 10 <= len(title) <= 300 else ''
+    
+    def _guess_year(self, arxiv_id: str, first_page_text: str, creation_date: str) -> str:
+        """Pick a publication year from the arXiv ID, page one, or the PDF creation date."""
+        if re.match(r'\d{4}\.', arxiv_id):
+            return '20' + arxiv_id[:2]
+        
+        # Copyright and date lines on page one are the best in-text hints
+        for line in first_page_text.split('\n'):
+            if re.search(r'(©|copyright|published|received|accepted)', line, re.IGNORECASE):
+                year_match = YEAR_PATTERN.search(line)
+                if year_match:
+                    return year_match.group(0)
+        
+        year_match = re.match(r'D:(\d{4})', creation_date)
+        if year_match:
+            return year_match.group(1)
+        
+        year_match = YEAR_PATTERN.search(first_page_text)
+        return year_match.group(0) if year_match else ''
+    
+    def _empty_metadata(self) -> Dict[str, str]:
+        return {
             'title': '',
             'authors': '',
             'journal': '',
             'year': '',
-            'doi': ''
+            'doi': '',
+            'arxiv_id': ''
         }
+    
+    def get_paper_metadata(self, text: str) -> Dict[str, str]:
+        """Extract basic metadata from the start and end of already-extracted text.
         
-        lines = text.split('\n')
+        Fallback for sources PyMuPDF cannot read; never scans the whole document.
+        """
+        metadata = self._empty_metadata()
+        head, tail = text[:4000], text[-4000:]
         
         # Try to find title (usually first few lines)
-        for i, line in enumerate(lines[:10]):
+        for line in head.split('\n')[:10]:
             line = line.strip()
             if len(line) > 10 and len(line) < 200 and not line.isupper():
                 metadata['title'] = line
                 break
         
         # Look for DOI
-        doi_match = re.search(r'doi:?\s*([^\s]+)', text, re.IGNORECASE)
+        doi_match = DOI_PATTERN.search(head) or DOI_PATTERN.search(tail)
         if doi_match:
             metadata['doi'] = doi_match.group(1)
         
+        arxiv_match = ARXIV_ID_PATTERN.search(head)
+        if arxiv_match:
+            metadata['arxiv_id'] = arxiv_match.group(1)
+        
         # Look for year
-        year_match = re.search(r'\b(19|20)\d{2}\b', text)
-        if year_match:
-            metadata['year'] = year_match.group(0)
+        metadata['year'] = self._guess_year(metadata['arxiv_id'], head, '')
         
         return metadata
+    
+    def merge_metadata(self, primary: Dict[str, str], fallback: Dict[str, str]) -> Dict[str, str]:
+        """Fill empty fields of `primary` from `fallback`."""
+        return {key: primary.get(key) or fallback.get(key, '') for key in primary}
+    
+    def build_document(self, pdf_source: Union[str, bytes], source_key: str = '') -> PaperDocument:
+        """Run the full extraction pipeline on a PDF and return a PaperDocument."""
+        # Metadata comes from the PDF info and first/last pages, before the full text is read
+        metadata = self.extract_pdf_metadata(pdf_source)
+        
+        # Extract and clean page by page in a single pass
+        text = self.normalize_pages(self.iter_pdf_pages(pdf_source))
+        
+        # Fill anything PyMuPDF could not provide from the head and tail of the text
+        if not all(metadata[key] for key in ('title', 'year')):
+            metadata = self.merge_metadata(metadata, self.get_paper_metadata(text))
+        
+        # Sections, sentences and findings are stored as offsets into the one text buffer;
+        # the sentence analysis is segmented once here and reused by every later stage
+        section_spans = self.find_section_spans(text)
+        analysis = analyze(text)
+        finding_ids = self.find_key_finding_ids(analysis)
+        
+        return PaperDocument.from_analysis(analysis, metadata, section_spans, finding_ids, source_key)
 
-def process_paper_input(input_source: str) -> Tuple[str, Dict]:
-    """Main function to process paper input (file upload or arXiv ID)."""
+def process_paper_input(input_source: Union[str, bytes], library: Optional[PaperLibrary] = None,
+                        refresh: bool = False) -> PaperDocument:
+    """Main function to process paper input (PDF bytes, file path or arXiv ID).
+    
+    Papers already in the library are reopened instead of reprocessed (unless
+    `refresh` is set); newly processed papers are saved to it.
+    """
     processor = ScientificPaperProcessor()
+    library = library or get_library()
     
-    if input_source.startswith('http') or input_source.startswith('arxiv.org'):
-        # Extract arXiv ID from URL
-        arxiv_id = input_source.split('/')[-1]
-        if arxiv_id.startswith('abs/'):
-            arxiv_id = arxiv_id[4:]
-        text = processor.download_arxiv_paper(arxiv_id)
+    if isinstance(input_source, (bytes, bytearray, memoryview)):
+        # Uploaded PDF already held in memory
+        source_key = pdf_source_key(input_source)
+        pdf_source = input_source
+    elif os.path.exists(input_source):
+        # Local file path
+        with open(input_source, 'rb') as f:
+            source_key = pdf_source_key(f.read())
+        pdf_source = input_source
     else:
-        # Assume it's a file path
-        if not os.path.exists(input_source):
-            raise FileNotFoundError(f"File not found: {input_source}")
-        text = processor.extract_text_from_pdf(input_source)
+        # arXiv URL, "arXiv:" reference or bare ID
+        arxiv_id = normalize_arxiv_id(input_source)
+        if not arxiv_id:
+            raise FileNotFoundError(f"Not a file or arXiv reference: {input_source}")
+        source_key = arxiv_source_key(arxiv_id)
+        pdf_source = None
     
-    # Clean the text
-    text = processor.clean_text(text)
+    paper_id = library.find_paper(source_key)
+    if paper_id is not None and not refresh:
+        return library.load_paper(paper_id)
     
-    # Extract sections
-    sections = processor.extract_paper_sections(text)
+    if pdf_source is None:
+        pdf_source = processor.fetch_arxiv_pdf(arxiv_id)
     
-    # Extract metadata
-    metadata = processor.get_paper_metadata(text)
+    document = processor.build_document(pdf_source, source_key)
+    library.add_paper(document)
+    return document
+
+
+def process_paper_batch(pdf_sources: List[Union[str, bytes]],
+                        library: Optional[PaperLibrary] = None) -> List[PaperDocument]:
+    """Process many local PDFs (paths or bytes) and save them with one bulk insert."""
+    processor = ScientificPaperProcessor()
+    library = library or get_library()
     
-    # Extract key findings
-    findings = processor.extract_key_findings(text)
+    documents = []
+    for pdf_source in pdf_sources:
+        if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+            source_key = pdf_source_key(pdf_source)
+        else:
+            with open(pdf_source, 'rb') as f:
+                source_key = pdf_source_key(f.read())
+        documents.append(processor.build_document(pdf_source, source_key))
     
-    return text, {
-        'sections': sections,
-        'metadata': metadata,
-        'findings': findings,
-        'full_text': text
-    } 
\ No newline at end of file
+    library.add_papers(documents)
+    return documents
@@ -1,20 +1,50 @@
-import os
-os.environ["TRANSFORMERS_NO_TF"] = "1"
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import re
+import time
 from typing import Dict, List, Optional
+from paper_document import PaperDocument, SECTION_NAMES
+from paper_library import PaperLibrary, get_library
+from models import get_generator
+from batching import get_batcher
+from deadline import Deadline, DegradationPolicy
+from textrank import summarize_extractive
+from text_analysis import SentenceRange, analyze
+
+# Sections each style summarizes, in script order
+STYLE_SECTIONS = {
+    "educational": ['abstract', 'introduction', 'methods', 'results', 'discussion'],
+    "storytelling": ['introduction', 'methods', 'results'],
+    "interview": ['abstract', 'introduction', 'methods', 'results'],
+    "news": ['abstract', 'introduction', 'discussion'],
+}
 
 class PodcastGenerator:
-    def __init__(self):
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        self.generator = pipeline("text2text-generation", model="google/flan-t5-base")
+    def __init__(self, deadline: Optional[Deadline] = None, engine: str = "abstractive"):
+        # BART runs behind the shared micro-batching worker instead of being called directly
+        self.batcher = get_batcher("summarize")
+        self.engine = engine
+        self.deadline = deadline
+        self.policy = DegradationPolicy(deadline)
+        self._summaries = {}
+        self._document = None
+    
+    @property
+    def generator(self):
+        """flan-t5 pipeline, loaded on first use."""
+        return get_generator()
         
-    def generate_podcast_script(self, paper_data: Dict, style: str = "educational") -> str:
+    def generate_podcast_script(self, paper_data: PaperDocument, style: str = "educational") -> str:
         """Generate a podcast-style script from scientific paper data."""
         
-        sections = paper_data['sections']
-        metadata = paper_data['metadata']
-        findings = paper_data['findings']
+        self._document = paper_data
+        sections = paper_data.sections
+        metadata = paper_data.metadata
+        findings = paper_data.findings
+        
+        # Let the deadline policy split the time budget across the sections we will summarize,
+        # including the abstract for the episode description when the script itself does not use it
+        stages = [name for name in STYLE_SECTIONS.get(style, STYLE_SECTIONS["educational"]) if sections.get(name)]
+        if sections.get('abstract') and 'abstract' not in stages:
+            stages.append('abstract')
+        self.policy.begin(stages)
         
         # Choose script template based on style
         if style == "educational":
@@ -88,7 +118,8 @@ The results tell us that: {results_summary}
         # Discussion and implications
         if sections.get('discussion'):
             discussion_summary = self._summarize_for_podcast(sections['discussion'], "discussion")
-            script_parts.append(f"""
+            if discussion_summary:  # empty when skipped to meet the deadline
+                script_parts.append(f"""
 What does this all mean? {discussion_summary}
 """)
         
@@ -284,7 +315,8 @@ Here are the major findings from this study:
         # Impact
         if sections.get('discussion'):
             discussion_summary = self._summarize_for_podcast(sections['discussion'], "discussion")
-            script_parts.append(f"""
+            if discussion_summary:  # empty when skipped to meet the deadline
+                script_parts.append(f"""
 The implications of this research are significant: {discussion_summary}
 """)
         
@@ -301,34 +333,89 @@ keeping you informed about the latest discoveries that shape our world.
         return "\n".join(script_parts)
     
     def _summarize_for_podcast(self, text: str, section_type: str) -> str:
-        """Generate podcast-friendly summaries of paper sections."""
+        """Generate podcast-friendly summaries of paper sections.
         
-        # Clean and chunk the text
-        text = re.sub(r'\s+', ' ', text).strip()
+        Under a deadline the summary may use fewer chunks or a shorter length,
+        be skipped (optional sections, returns ''), or fall back to leading sentences.
+        """
         
         if len(text) < 200:
-            return text
-        
-        # Create chunks for summarization
-        chunks = [text[i:i+800] for i in range(0, len(text), 800)]
+            return ' '.join(text.split())
+        
+        # The abstract is summarized for both the script and the episode description
+        cache_key = (section_type, text)
+        if cache_key in self._summaries:
+            return self._summaries[cache_key]
+        
+        # Chunk on sentence boundaries taken from the shared document analysis
+        sentences = self._section_sentences(text, section_type)
+        chunks = sentences.chunks(800)
+        
+        if self.engine == "extractive":
+            # TextRank over the whole section, about as many sentences as BART would write
+            summary = summarize_extractive(text, num_sentences=min(8, 2 * len(chunks)), sentences=sentences)
+            self._summaries[cache_key] = summary
+            return summary
+        
+        plan = self.policy.plan(section_type, len(chunks))
+        if plan.skip:
+            return ''
+        if plan.lead_only:
+            summary = self._lead_sentences(sentences)
+            self._summaries[cache_key] = summary
+            return summary
+        if plan.max_chunks:
+            chunks = chunks[:plan.max_chunks]
+        
+        # Queue every chunk at once so they share micro-batches with other requests
+        started = time.monotonic()
+        futures = [
+            self.batcher.submit(chunk.text, max_length=plan.max_length, min_length=plan.min_length, do_sample=False)
+            for chunk in chunks
+        ]
         
         summaries = []
-        for chunk in chunks:
-            try:
-                result = self.summarizer(chunk, max_length=150, min_length=30, do_sample=False)
-                summaries.append(result[0]['summary_text'])
-            except Exception as e:
-                # Fallback: use first few sentences
-                sentences = re.split(r'[.!?]+', chunk)
-                summaries.append('. '.join(sentences[:3]) + '.')
-        
-        return ' '.join(summaries)
+        out_of_time = False
+        for chunk, future in zip(chunks, futures):
+            if not out_of_time:
+                try:
+                    timeout = max(0.1, self.deadline.remaining()) if self.deadline else None
+                    summaries.append(future.result(timeout=timeout))
+                    continue
+                except Exception:
+                    if self.deadline and self.deadline.expired():
+                        # Withdraw the chunks still waiting for the model so they stop taking its time
+                        out_of_time = True
+                        for pending in futures:
+                            pending.cancel()
+                        self.policy._record(f"{section_type}: deadline hit, used extractive summary")
+            # Fallback: extractive summary of the chunk (milliseconds, no model)
+            summaries.append(summarize_extractive(chunk.text, num_sentences=3, sentences=chunk))
+        
+        self.policy.observe(time.monotonic() - started, len(chunks), plan.max_length)
+        summary = ' '.join(summaries)
+        self._summaries[cache_key] = summary
+        return summary
+    
+    def _section_sentences(self, text: str, section_type: str) -> SentenceRange:
+        """Sentences of a section, reusing the paper's analysis when `text` is one of its sections."""
+        document = self._document
+        if document is not None and section_type in SECTION_NAMES:
+            start, end = document.sections.span(section_type)
+            if end - start == len(text):
+                return document.analysis.sentences(start, end)
+        return analyze(text).sentences()
     
-    def generate_episode_metadata(self, paper_data: Dict, script: str) -> Dict:
+    def _lead_sentences(self, sentences: SentenceRange, count: int = 3) -> str:
+        """Cheap extractive fallback: the first few sentences of the text."""
+        return ' '.join(sentences[:count])
+    
+    def generate_episode_metadata(self, paper_data: PaperDocument, script: str) -> Dict:
         """Generate metadata for the podcast episode."""
         
-        metadata = paper_data['metadata']
-        sections = paper_data['sections']
+        self._document = paper_data
+        metadata = paper_data.metadata
+        sections = paper_data.sections
         
         # Estimate episode duration (average speaking rate: 150 words per minute)
         word_count = len(script.split())
@@ -356,10 +443,20 @@ keeping you informed about the latest discoveries that shape our world.
             'paper_doi': metadata.get('doi', '')
         }
 
-def create_podcast_from_paper(paper_data: Dict, style: str = "educational") -> Dict:
-    """Main function to create a podcast from scientific paper data."""
+def create_podcast_from_paper(paper_data: PaperDocument, style: str = "educational",
+                              library: Optional[PaperLibrary] = None,
+                              deadline: Optional[Deadline] = None,
+                              engine: str = "abstractive") -> Dict:
+    """Main function to create a podcast from scientific paper data.
+    
+    The script and episode metadata are saved to the paper library when the
+    paper is stored there. With a `deadline` (started when the request was
+    accepted), summarization degrades gracefully to finish on time; the steps
+    taken are listed in 'degradations'. `engine` picks BART ("abstractive")
+    or TextRank ("extractive") summaries.
+    """
     
-    generator = PodcastGenerator()
+    generator = PodcastGenerator(deadline, engine)
     
     # Generate the script
     script = generator.generate_podcast_script(paper_data, style)
@@ -367,8 +464,16 @@ def create_podcast_from_paper(paper_data: Dict, style: str = "educational") -> D
     # Generate episode metadata
     metadata = generator.generate_episode_metadata(paper_data, script)
     
+    # Keep the episode with its paper so it can be reopened later
+    library = library or get_library()
+    paper_id = library.find_paper(paper_data.source_key) if paper_data.source_key else None
+    if paper_id is not None:
+        library.add_podcast(paper_id, style, script, metadata)
+        library.add_summary(paper_id, "episode_description", metadata['description'])
+    
     return {
         'script': script,
         'metadata': metadata,
-        'style': style
-    } 
\ No newline at end of file
+        'style': style,
+        'degradations': generator.policy.degradations
+    }
\ No newline at end of file
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from paper_library import arxiv_source_key
+from source_ids import normalize_arxiv_id, youtube_video_id
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "abandoned", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+        self.followers = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive the same result (or exception).
+    Nothing is cached once the call finishes; this only removes duplicate
+    in-flight work.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.followers += 1
+
+            if leader:
+                return self._lead(key, call, fn, args, kwargs)
+
+            call.done.wait()
+            if call.abandoned:
+                # The leader was interrupted (e.g. its session went away); try again
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key, call, fn, args, kwargs):
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def followers(self, key: Hashable) -> int:
+        """Number of callers currently waiting on the running call for `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.followers if call else 0
+
+
+def normalize_source(source) -> str:
+    """Reduce a job input to a canonical identity.
+
+    arXiv links and IDs become "arxiv:<id>", YouTube links "youtube:<video id>",
+    PDF/audio bytes and local files the SHA-256 of their content.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return "sha256:" + hashlib.sha256(source).hexdigest()
+
+    source = str(source).strip()
+    if os.path.isfile(source):
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return "sha256:" + digest.hexdigest()
+
+    arxiv_id = normalize_arxiv_id(source)
+    if arxiv_id:
+        return arxiv_source_key(arxiv_id)
+
+    if "youtu" in source:
+        return "youtube:" + youtube_video_id(source)
+
+    return source
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(v) for v in value]
+        return tuple(sorted(items) if isinstance(value, (set, frozenset)) else items)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def job_key(kind: str, source, **params) -> Tuple:
+    """Key identifying a job by its kind, normalized input and parameters."""
+    return (kind, normalize_source(source), _freeze(params))
+
+
+flights = SingleFlight()
@@ -0,0 +1,29 @@
+import hashlib
+import re
+from typing import Optional
+
+# Standard library only: job keys are built from these without loading whisper or the PDF stack
+
+ARXIV_INPUT_PATTERN = re.compile(
+    r'^(?:(?:https?://)?(?:www\.|export\.)?arxiv\.org/(?:abs|pdf)/|arxiv:\s*)?'
+    r'(\d{4}\.\d{4,5}(?:v\d+)?|[a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)(?:\.pdf)?/?$',
+    re.IGNORECASE
+)
+
+_VIDEO_ID_RE = re.compile(r'(?:v=|youtu\.be/|shorts/|embed/|live/)([A-Za-z0-9_-]{11})')
+
+
+def normalize_arxiv_id(input_source: str) -> Optional[str]:
+    """Return the arXiv ID in an arXiv URL, "arXiv:" reference or bare ID, else None."""
+    match = ARXIV_INPUT_PATTERN.match(input_source.strip())
+    return match.group(1) if match else None
+
+
+def youtube_video_id(url):
+    """Return the 11-character video ID of a YouTube URL (or a stable hash for other URLs)."""
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    if re.fullmatch(r'[A-Za-z0-9_-]{11}', url.strip()):
+        return url.strip()
+    return "url-" + hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:16]
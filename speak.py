@@ -1,8 +1,142 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
+from text_analysis import analyze
+from tts_cache import get_segment_cache, segment_key
 
-def speak_summary(text, lang="en"):
+TTS_BACKEND = "gtts"
+
+# gTTS voices differ by regional accent (tld); each speaker gets its own per language
+SPEAKER_VOICES = {
+    "en": {"host": "com", "guest": "co.uk"},
+    "en-uk": {"host": "co.uk", "guest": "com.au"},
+    "fr": {"host": "fr", "guest": "ca"},
+    "es": {"host": "es", "guest": "com.mx"},
+    "hi": {"host": "co.in", "guest": "com"},
+}
+
+# One silent MPEG-2 Layer III frame (24 kHz, mono, 32 kbps, 24 ms), matching gTTS output
+_SILENT_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+_FRAME_MS = 24
+
+_TURN_RE = re.compile(r'^\s*(Q|A)\s*:\s*', re.IGNORECASE)
+
+
+def _voice(lang, tld=None):
     real_lang = lang if lang != "en-uk" else "en"
-    tts = gTTS(text, lang=real_lang, tld="co.uk" if lang == "en-uk" else "com")
-    filename = "summary.mp3"
-    tts.save(filename)
-    return filename
+    if tld is None:
+        tld = "co.uk" if lang == "en-uk" else "com"
+    return real_lang, tld
+
+
+def _synthesize(text, lang, tld):
+    tts = gTTS(text, lang=lang, tld=tld)
+    buf = io.BytesIO()
+    tts.write_to_fp(buf)
+    return buf.getvalue()
+
+
+def _segments(text):
+    """Sentences of `text`, the unit of synthesis and caching."""
+    analysis = analyze(text)
+    return [" ".join(analysis.sentence(i).split()) for i in range(len(analysis))]
+
+
+def render_segments(segments, max_workers=4, cache=None):
+    """Synthesize (text, lang, tld) segments and return their MP3 clips, in order.
+
+    Clips come from the segment cache when the same text was synthesized
+    before in the same voice; only the rest are sent to the TTS backend, on a
+    bounded thread pool, and then added to the cache.
+    """
+    cache = cache or get_segment_cache()
+    keys = [segment_key(text, lang, tld, TTS_BACKEND) for text, lang, tld in segments]
+    clips = {}
+    missing = {}
+    for key, segment in zip(keys, segments):
+        if key in clips or key in missing:
+            continue
+        audio = cache.get(key)
+        if audio is None:
+            missing[key] = segment
+        else:
+            clips[key] = audio
+
+    def render(item):
+        key, (text, lang, tld) = item
+        audio = _synthesize(text, lang, tld)
+        cache.put(key, audio)
+        return key, audio
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            clips.update(pool.map(render, missing.items()))
+
+    return [clips[key] for key in keys]
+
+
+def speak_summary(text, lang="en", tld=None):
+    """Synthesize `text` and return the MP3 audio as bytes.
+
+    Each sentence is a cached segment, so only sentences never spoken before
+    in this voice cost a synthesis call; the clips are stitched in memory.
+    """
+    real_lang, tld = _voice(lang, tld)
+    segments = [(sentence, real_lang, tld) for sentence in _segments(text)]
+    return b"".join(render_segments(segments))
+
+
+def silence(ms):
+    """Return `ms` milliseconds of silent MP3 frames."""
+    return _SILENT_FRAME * max(1, -(-ms // _FRAME_MS))
+
+
+def parse_speaker_turns(script):
+    """Split a Q:/A: script into (speaker, text) turns.
+
+    "Q:" lines belong to the host, "A:" lines to the guest; unmarked lines
+    continue the current speaker, and narration before the first marker is
+    read by the host. The markers themselves are not spoken.
+    """
+    turns = []
+    speaker = "host"
+    for line in script.split("\n"):
+        match = _TURN_RE.match(line)
+        if match:
+            speaker = "host" if match.group(1).upper() == "Q" else "guest"
+            line = line[match.end():]
+        line = line.strip()
+        if not line:
+            continue
+        if turns and turns[-1][0] == speaker:
+            turns[-1] = (speaker, turns[-1][1] + " " + line)
+        else:
+            turns.append((speaker, line))
+    return turns
+
+
+def render_turns(turns, lang="en", max_workers=4, gap_ms=400):
+    """Synthesize speaker turns concurrently and join them into one MP3.
+
+    Turns are rendered each in its speaker's voice, sentence by sentence
+    through the segment cache on one bounded thread pool, then concatenated
+    in memory with short silences between them.
+    """
+    if not turns:
+        return b""
+
+    voices = SPEAKER_VOICES.get(lang, SPEAKER_VOICES["en"])
+    real_lang = _voice(lang)[0]
+
+    segments = []
+    bounds = []
+    for speaker, text in turns:
+        tld = voices.get(speaker, voices["host"])
+        start = len(segments)
+        segments.extend((sentence, real_lang, tld) for sentence in _segments(text))
+        bounds.append((start, len(segments)))
+
+    clips = render_segments(segments, max_workers=max_workers)
+    turn_clips = [b"".join(clips[start:end]) for start, end in bounds if end > start]
+    return silence(gap_ms).join(turn_clips)
@@ -1,13 +1,21 @@
-import os
-os.environ["TRANSFORMERS_NO_TF"] = "1"
-from transformers import pipeline
-
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
-def summarize_text(text):
-    chunks = [text[i:i+1000] for i in range(0, len(text), 1000)]
-    summary = ""
-    for chunk in chunks:
-        result = summarizer(chunk, max_length=130, min_length=30, do_sample=False)
-        summary += result[0]['summary_text'] + " "
-    return summary.strip()
+from batching import summarize_batched
+from textrank import summarize_extractive
+from text_analysis import analyze
+
+# "abstractive" is fluent BART output; "extractive" is TextRank, milliseconds on CPU
+SUMMARY_ENGINES = ("abstractive", "extractive")
+
+CHUNK_CHARS = 1000
+SUMMARY_OPTIONS = {"max_length": 130, "min_length": 30, "do_sample": False}
+
+def summarize_text(text, engine="abstractive"):
+    if engine == "extractive":
+        return summarize_extractive(text)
+    if engine != "abstractive":
+        raise ValueError(f"Unknown summary engine: {engine}")
+
+    # Sentence-aligned chunks from the shared analysis, so no sentence is cut in half
+    chunks = [chunk.text for chunk in analyze(text).sentences().chunks(CHUNK_CHARS)]
+    # All chunks are queued at once and batched with other callers' requests
+    summaries = summarize_batched(chunks, **SUMMARY_OPTIONS)
+    return " ".join(summaries).strip()
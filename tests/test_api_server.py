@@ -0,0 +1,65 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from api_server import ApiHandler
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def api(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    handler = type("Handler", (ApiHandler,), {"queue": queue, "pool": None, "token": ""})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", queue
+    server.shutdown()
+    server.server_close()
+    queue.close()
+
+
+def _post(url, body, content_type="application/json"):
+    request = Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    try:
+        with urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_paper_jobs_take_arxiv_references(api):
+    base, queue = api
+    status, body = _post(f"{base}/jobs/paper", json.dumps({"source": "https://arxiv.org/abs/2103.01234"}).encode())
+    assert status == 202
+    assert queue.claim("w1")["params"] == {"source": "arXiv:2103.01234"}
+
+    # Other spellings of the same paper are the same job
+    status, again = _post(f"{base}/jobs/paper", json.dumps({"source": "2103.01234"}).encode())
+    assert again["id"] == body["id"]
+
+
+def test_paper_jobs_reject_server_paths(api):
+    base, queue = api
+    for source in ("/etc/passwd", "../library.db", ""):
+        status, body = _post(f"{base}/jobs/paper", json.dumps({"source": source}).encode())
+        assert status == 400
+    assert queue.stats()["queued"] == 0
+
+
+def test_uploaded_pdfs_are_accepted(api):
+    base, queue = api
+    status, _ = _post(f"{base}/jobs/paper?filename=paper.pdf", b"%PDF-1.4", "application/pdf")
+    assert status == 202
+    assert queue.claim("w1")["payload"] == b"%PDF-1.4"
+
+
+def test_refresh_is_not_part_of_the_job(api):
+    base, queue = api
+    _, refreshed = _post(f"{base}/jobs/paper", json.dumps({"source": "2103.01234", "refresh": True}).encode())
+    _, plain = _post(f"{base}/jobs/paper", json.dumps({"source": "2103.01234"}).encode())
+    assert plain["id"] == refreshed["id"]
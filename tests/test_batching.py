@@ -0,0 +1,72 @@
+import os
+import threading
+
+import pytest
+
+import batching
+from batching import MicroBatcher, load_auth_key
+
+
+def test_requests_are_batched_and_answered_in_order():
+    batches = []
+    release = threading.Event()
+
+    def run_batch(items, options):
+        release.wait(1)
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(5)]
+    release.set()
+
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8]
+    assert sum(len(batch) for batch in batches) == 5
+    assert len(batches) < 5
+
+
+def test_only_requests_with_the_same_options_share_a_batch():
+    seen = []
+
+    def run_batch(items, options):
+        seen.append((tuple(items), options["max_length"]))
+        return items
+
+    batcher = MicroBatcher(run_batch, max_wait_ms=50)
+    futures = [batcher.submit("a", max_length=60), batcher.submit("b", max_length=150)]
+    [future.result(timeout=5) for future in futures]
+
+    assert sorted(seen) == [(("a",), 60), (("b",), 150)]
+
+
+def test_a_failing_item_does_not_fail_its_batch():
+    def run_batch(items, options):
+        if "bad" in items:
+            raise ValueError("cannot summarize")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(run_batch, max_wait_ms=50)
+    futures = [batcher.submit(item) for item in ("ok", "bad", "fine")]
+
+    assert futures[0].result(timeout=5) == "OK"
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "FINE"
+
+
+def test_auth_key_is_required(tmp_path, monkeypatch):
+    monkeypatch.delenv("SMARTCAST_INFERENCE_KEY", raising=False)
+    path = str(tmp_path / "inference.key")
+
+    with pytest.raises(RuntimeError):
+        load_auth_key(path=path)
+
+    key = load_auth_key(create=True, path=path)
+    assert len(key) == 64
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert load_auth_key(path=path) == key
+
+
+def test_auth_key_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARTCAST_INFERENCE_KEY", "secret")
+    assert batching.load_auth_key(path=str(tmp_path / "missing.key")) == b"secret"
@@ -0,0 +1,46 @@
+from cpu_scheduler import candidate_splits, load_tuning, parse_cores, save_tuning, worker_cores
+
+
+def test_splits_use_every_core():
+    assert candidate_splits(8) == [
+        {"workers": 1, "threads": 8},
+        {"workers": 2, "threads": 4},
+        {"workers": 4, "threads": 2},
+        {"workers": 8, "threads": 1},
+    ]
+    assert candidate_splits(6) == [
+        {"workers": 1, "threads": 6},
+        {"workers": 2, "threads": 3},
+        {"workers": 3, "threads": 2},
+        {"workers": 6, "threads": 1},
+    ]
+
+
+def test_splits_are_capped_by_max_workers():
+    assert [split["workers"] for split in candidate_splits(8, max_workers=3)] == [1, 2]
+    assert candidate_splits(8, max_workers=1) == [{"workers": 1, "threads": 8}]
+    assert candidate_splits(1) == [{"workers": 1, "threads": 1}]
+
+
+def test_worker_cores_are_disjoint_and_cover_every_core():
+    cores = [0, 1, 2, 3, 4, 5, 6]
+    slices = [worker_cores(i, 3, cores) for i in range(3)]
+    # The first slices get the remainder
+    assert slices == [[0, 1, 2], [3, 4], [5, 6]]
+
+
+def test_more_workers_than_cores_get_one_core_each():
+    assert [worker_cores(i, 4, [2, 5]) for i in range(4)] == [[2], [5], [], []]
+
+
+def test_core_lists_are_parsed():
+    assert parse_cores("0-3,6") == [0, 1, 2, 3, 6]
+    assert parse_cores("") == []
+
+
+def test_tuning_round_trip(tmp_path):
+    path = str(tmp_path / "tuning" / "cpu.json")
+    assert load_tuning(path) == {}
+    save_tuning({"workers": 2, "threads": 4}, path)
+    assert load_tuning(path) == {"workers": 2, "threads": 4}
+
@@ -0,0 +1,84 @@
+import time
+
+from deadline import (Deadline, DegradationPolicy, FULL_MAX_LENGTH, SHORT_MAX_LENGTH,
+                      SummaryPlan)
+
+
+class FixedDeadline(Deadline):
+    """Deadline with a fixed amount of time left."""
+
+    def __init__(self, remaining):
+        super().__init__(remaining)
+        self._remaining = remaining
+
+    def remaining(self):
+        return self._remaining
+
+
+def test_no_deadline_means_full_summaries():
+    policy = DegradationPolicy(None)
+    policy.begin(["abstract", "methods"])
+    assert policy.plan("abstract", 10) == SummaryPlan()
+    assert policy.degradations == []
+
+
+def test_enough_time_means_full_summaries():
+    policy = DegradationPolicy(FixedDeadline(1000), seconds_per_token=0.01)
+    policy.begin(["abstract"])
+    assert policy.plan("abstract", 4) == SummaryPlan()
+
+
+def test_fewer_chunks_first():
+    # 2 s per full chunk, 5 s for this stage: two of the four chunks fit
+    policy = DegradationPolicy(FixedDeadline(5), seconds_per_token=2 / FULL_MAX_LENGTH)
+    policy.begin(["methods"])
+    plan = policy.plan("methods", 4)
+    assert plan.max_chunks == 2
+    assert plan.max_length == FULL_MAX_LENGTH
+    assert policy.degradations == ["methods: summarized 2 of 4 chunks"]
+
+
+def test_then_shorter_summaries():
+    # A full chunk no longer fits, a short one does
+    seconds_per_token = 1.0 / SHORT_MAX_LENGTH
+    policy = DegradationPolicy(FixedDeadline(1.5), seconds_per_token=seconds_per_token)
+    policy.begin(["methods"])
+    plan = policy.plan("methods", 3)
+    assert plan.max_length == SHORT_MAX_LENGTH
+    assert plan.max_chunks == 1
+
+
+def test_then_optional_sections_are_skipped_and_others_use_lead_sentences():
+    policy = DegradationPolicy(FixedDeadline(0.001), seconds_per_token=1.0)
+    policy.begin(["discussion", "results"])
+    assert policy.plan("discussion", 3).skip
+    assert policy.plan("results", 3).lead_only
+    assert policy.degradations == ["discussion: skipped", "results: used leading sentences"]
+
+
+def test_time_is_split_across_remaining_stages():
+    # 8 s left for two stages: 4 s each, so only two 2-second chunks fit in the first
+    policy = DegradationPolicy(FixedDeadline(8), seconds_per_token=2 / FULL_MAX_LENGTH)
+    policy.begin(["abstract", "methods"])
+    assert policy.plan("abstract", 4).max_chunks == 2
+
+
+def test_observe_moves_the_estimate_toward_measured_cost():
+    policy = DegradationPolicy(None, seconds_per_token=0.02)
+    policy.observe(seconds=4.0, n_chunks=2, max_length=100)
+    assert policy.seconds_per_token == 0.5 * 0.02 + 0.5 * 0.02
+
+
+def test_deadline_since_counts_time_before_it_was_created():
+    deadline = Deadline.since(10, time.time() - 4)
+    assert 5.5 < deadline.remaining() <= 6
+    assert not deadline.expired()
+    assert Deadline.since(1, time.time() - 5).expired()
+
+
+def test_each_degradation_is_recorded_once():
+    policy = DegradationPolicy(FixedDeadline(0.0))
+    policy.begin(["discussion", "discussion"])
+    policy.plan("discussion", 2)
+    policy.plan("discussion", 2)
+    assert policy.degradations == ["discussion: skipped"]
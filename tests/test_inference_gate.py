@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+
+from inference_gate import AdmissionController, InferenceBusyError, ModelGate
+
+
+class Interrupted(BaseException):
+    """Stands in for Streamlit's RerunException, which is not an Exception."""
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _queue_waiters(gate, session_ids, order, hold=False):
+    """Start one waiting thread per session id; each records its id once admitted.
+
+    With `hold`, admitted threads keep their slot until the test releases it.
+    """
+    threads = []
+    for session_id in session_ids:
+        def wait(session_id=session_id):
+            gate.acquire(session_id)
+            order.append(session_id)
+            if not hold:
+                gate.release()
+        thread = threading.Thread(target=wait)
+        thread.start()
+        threads.append(thread)
+        # Queue them one at a time so the submission order is fixed
+        _wait_for(lambda: gate.stats()["waiting"] == len(threads))
+    return threads
+
+
+def test_sessions_are_served_round_robin():
+    gate = ModelGate("bart", limit=1)
+    gate.acquire("holder")
+    order = []
+    threads = _queue_waiters(gate, ["a", "a", "a", "b", "c"], order)
+
+    gate.release()
+    for thread in threads:
+        thread.join(5)
+    # Session "a" queued three calls first, but "b" and "c" are not starved behind them
+    assert order == ["a", "b", "c", "a", "a"]
+    assert gate.stats() == {"active": 0, "waiting": 0, "limit": 1}
+
+
+def test_queue_position_is_reported_and_counts_down():
+    gate = ModelGate("bart", limit=1)
+    gate.acquire("holder")
+    order = []
+    threads = _queue_waiters(gate, ["a", "a"], order, hold=True)
+    positions = []
+    waiter = threading.Thread(target=lambda: gate.acquire("b", on_wait=positions.append))
+    waiter.start()
+    _wait_for(lambda: positions)
+    # Round-robin: b goes after a's first call, not after both
+    assert positions == [2]
+
+    gate.release()
+    _wait_for(lambda: order == ["a"])
+    _wait_for(lambda: positions == [2, 1])
+    gate.release()
+    waiter.join(5)
+    assert order == ["a"]
+
+    for _ in range(2):
+        gate.release()
+    for thread in threads:
+        thread.join(5)
+    assert order == ["a", "a"]
+
+
+def test_waiting_times_out_and_leaves_the_queue():
+    gate = ModelGate("whisper", limit=1)
+    gate.acquire("holder")
+    with pytest.raises(InferenceBusyError):
+        gate.acquire("a", timeout=0.1)
+    assert gate.stats() == {"active": 1, "waiting": 0, "limit": 1}
+
+    gate.release()
+    gate.acquire("b", timeout=1)
+    assert gate.stats()["active"] == 1
+
+
+def test_full_queue_is_rejected():
+    gate = ModelGate("whisper", limit=1, max_queue=1)
+    gate.acquire("holder")
+    threads = _queue_waiters(gate, ["a"], [])
+    with pytest.raises(InferenceBusyError):
+        gate.acquire("b")
+    gate.release()
+    threads[0].join(5)
+
+
+def test_interrupted_waiter_leaves_the_queue():
+    gate = ModelGate("whisper", limit=1)
+    gate.acquire("holder")
+
+    def interrupt(position):
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        gate.acquire("a", on_wait=interrupt)
+    gate.release()
+
+    # The withdrawn ticket is never granted, so the slot is free for the next caller
+    assert gate.stats() == {"active": 0, "waiting": 0, "limit": 1}
+    gate.acquire("b", timeout=1)
+
+
+def test_waiter_interrupted_after_being_granted_releases_the_slot():
+    gate = ModelGate("whisper", limit=1)
+    gate.acquire("holder")
+    reported = threading.Event()
+    proceed = threading.Event()
+    errors = []
+
+    def on_wait(position):
+        reported.set()
+        # The slot is granted while the callback is still running, then the callback is interrupted
+        proceed.wait(5)
+        raise Interrupted()
+
+    def wait():
+        try:
+            gate.acquire("a", on_wait=on_wait)
+        except Interrupted as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    reported.wait(5)
+    gate.release()
+    _wait_for(lambda: gate.stats()["waiting"] == 0)
+    proceed.set()
+    waiter.join(5)
+
+    assert errors
+    assert gate.stats() == {"active": 0, "waiting": 0, "limit": 1}
+    gate.acquire("b", timeout=1)
+
+
+def test_controller_runs_calls_through_the_model_gate():
+    controller = AdmissionController(limits={"qa": 1})
+    assert controller.run("qa", lambda x: x * 2, 21, session_id="s") == 42
+    assert controller.gate("qa").stats() == {"active": 0, "waiting": 0, "limit": 1}
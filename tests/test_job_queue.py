@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.2, max_attempts=2, result_ttl=60)
+    yield q
+    q.close()
+
+
+def test_claim_runs_jobs_oldest_first(queue):
+    first = queue.submit("summarize", {"text": "a"})
+    second = queue.submit("summarize", {"text": "b"})
+
+    assert queue.claim("w1")["id"] == first
+    assert queue.claim("w1")["id"] == second
+    assert queue.claim("w1") is None
+
+
+def test_complete_and_result(queue):
+    job_id = queue.submit("summarize", {"text": "a"})
+    job = queue.claim("w1")
+    assert job["params"] == {"text": "a"}
+    assert queue.status(job_id)["status"] == "running"
+
+    assert queue.complete(job_id, "w1", {"summary": "A"})
+    assert queue.status(job_id)["status"] == "done"
+    assert queue.result(job_id) == {"summary": "A"}
+
+
+def test_only_the_lease_holder_can_finish(queue):
+    job_id = queue.submit("summarize", {"text": "a"})
+    queue.claim("w1")
+
+    assert not queue.complete(job_id, "w2", {"summary": "stolen"})
+    assert not queue.renew(job_id, "w2")
+    assert queue.renew(job_id, "w1")
+
+
+def test_expired_lease_is_claimed_again(queue):
+    job_id = queue.submit("summarize", {"text": "a"})
+    queue.claim("w1")
+    assert queue.claim("w2") is None
+
+    time.sleep(0.3)
+    job = queue.claim("w2")
+    assert job["id"] == job_id
+    assert job["attempts"] == 1  # attempts before this claim
+    # The first worker lost the job and can no longer report it
+    assert not queue.complete(job_id, "w1", {})
+    assert queue.complete(job_id, "w2", {})
+
+
+def test_job_fails_after_max_attempts(queue):
+    job_id = queue.submit("summarize", {"text": "a"})
+    for worker in ("w1", "w2"):
+        assert queue.claim(worker)["id"] == job_id
+        time.sleep(0.3)
+
+    assert queue.claim("w3") is None
+    status = queue.status(job_id)
+    assert status["status"] == "failed"
+    assert "2 attempts" in status["error"]
+
+
+def test_claim_filters_by_kind(queue):
+    queue.submit("summarize", {"text": "a"})
+    audio = queue.submit("audio", {"url": "x"})
+
+    assert queue.claim("w1", kinds=["audio"])["id"] == audio
+    assert queue.claim("w1", kinds=["audio"]) is None
+
+
+def test_identical_submissions_are_deduplicated(queue):
+    job_id = queue.submit("paper", {"source": "2101.00001"})
+    assert queue.submit("paper", {"source": "2101.00001"}) == job_id
+    assert queue.submit("paper", {"source": "2101.00002"}) != job_id
+    assert queue.submit("paper", {}, payload=b"%PDF-1") != queue.submit("paper", {}, payload=b"%PDF-2")
+
+
+def test_done_jobs_are_reused_until_refresh_or_expiry(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), result_ttl=0.2)
+    job_id = queue.submit("paper", {"source": "2101.00001"})
+    queue.claim("w1")
+    queue.complete(job_id, "w1", {})
+
+    assert queue.submit("paper", {"source": "2101.00001"}) == job_id
+    assert queue.submit("paper", {"source": "2101.00001"}, refresh=True) != job_id
+
+    time.sleep(0.3)
+    fresh = JobQueue(str(tmp_path / "other.db"), result_ttl=0.2)
+    done = fresh.submit("paper", {"source": "x"})
+    fresh.claim("w1")
+    fresh.complete(done, "w1", {})
+    time.sleep(0.3)
+    assert fresh.submit("paper", {"source": "x"}) != done
+
+
+def test_failed_jobs_are_not_reused(queue):
+    job_id = queue.submit("summarize", {"text": "a"})
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "boom")
+
+    assert queue.submit("summarize", {"text": "a"}) != job_id
+
+
+def test_position_counts_queued_jobs_of_the_same_kind(queue):
+    queue.submit("audio", {"url": "1"})
+    queue.submit("summarize", {"text": "a"})
+    second_audio = queue.submit("audio", {"url": "2"})
+
+    assert queue.status(second_audio)["position"] == 2
+
+
+def test_stats(queue):
+    queue.submit("summarize", {"text": "a"})
+    queue.submit("summarize", {"text": "b"})
+    queue.claim("w1")
+
+    assert queue.stats() == {"queued": 1, "running": 1, "done": 0, "failed": 0}
+
+
+def test_in_memory_queue_is_rejected():
+    with pytest.raises(ValueError):
+        JobQueue(":memory:")
+
+
+def test_refresh_reaches_the_worker_but_not_the_dedupe_key(queue):
+    refreshed = queue.submit("paper", {"source": "2101.00001"}, refresh=True)
+    assert queue.submit("paper", {"source": "2101.00001"}) == refreshed
+    assert queue.claim("w1")["params"] == {"source": "2101.00001", "refresh": True}
@@ -0,0 +1,19 @@
+import base64
+
+import pytest
+
+from job_worker import run_speech
+
+
+def test_speech_jobs_return_audio_and_errors_per_language(monkeypatch):
+    pytest.importorskip("gtts")
+    import language_fanout
+
+    def fake_fan_out(text, langs, style=None, session_id="default"):
+        assert style is None
+        return {"en": b"mp3", "fr": RuntimeError("translator crashed")}
+
+    monkeypatch.setattr(language_fanout, "fan_out", fake_fan_out)
+    result = run_speech({"id": "job", "params": {"text": "Hi.", "langs": ["en", "fr"], "style": ""}}, None)
+    assert result == {"audio": {"en": base64.b64encode(b"mp3").decode("ascii")},
+                      "errors": {"fr": "translator crashed"}}
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+pytest.importorskip("gtts")
+
+import language_fanout  # noqa: E402
+from language_fanout import _translate_turns, fan_out, language_audio  # noqa: E402
+
+SCRIPT = "Q: What did you find?\nA: That widgets work.\nQ: Why?\nA: Because of gears."
+
+
+def test_one_failing_language_does_not_affect_the_others(monkeypatch):
+    def fake_language_audio(text, lang, style, session_id):
+        if lang == "fr":
+            raise RuntimeError("translator crashed")
+        return f"{lang}:{text}".encode()
+
+    monkeypatch.setattr(language_fanout, "language_audio", fake_language_audio)
+    results = fan_out("Widgets work.", ["en", "fr", "es", "en"])
+
+    assert list(results) == ["en", "fr", "es"]
+    assert results["en"] == b"en:Widgets work."
+    assert results["es"] == b"es:Widgets work."
+    assert isinstance(results["fr"], RuntimeError)
+
+
+def test_languages_are_rendered_concurrently(monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_language_audio(text, lang, style, session_id):
+        # Deadlocks (and times out) unless all three languages run at once
+        barrier.wait()
+        return lang.encode()
+
+    monkeypatch.setattr(language_fanout, "language_audio", fake_language_audio)
+    assert fan_out("Concurrent widgets.", ["en", "fr", "es"], max_workers=3) == {
+        "en": b"en", "fr": b"fr", "es": b"es"
+    }
+
+
+def test_no_languages_is_a_no_op():
+    assert fan_out("Widgets work.", []) == {}
+
+
+def test_turns_are_translated_in_one_call_when_lines_line_up(monkeypatch):
+    calls = []
+
+    def fake_translate(text, src_lang, tgt_lang):
+        calls.append(text)
+        return text.upper()
+
+    monkeypatch.setattr(language_fanout, "translate_text", fake_translate)
+    assert _translate_turns(["one.", "two."], "fr") == ["ONE.", "TWO."]
+    assert calls == ["one.\ntwo."]
+
+
+def test_turns_fall_back_to_one_call_each_when_lines_are_merged(monkeypatch):
+    def fake_translate(text, src_lang, tgt_lang):
+        # The model joins the lines of a batch into one
+        return text.replace("\n", " ").upper()
+
+    monkeypatch.setattr(language_fanout, "translate_text", fake_translate)
+    assert _translate_turns(["one.", "two.", "three."], "fr") == ["ONE.", "TWO.", "THREE."]
+
+
+def test_translated_interview_turns_keep_their_speakers(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(language_fanout, "translate_text",
+                        lambda text, src_lang, tgt_lang: text.replace("\n", "\n\n").upper())
+    monkeypatch.setattr(language_fanout, "render_turns", lambda turns, lang: rendered.append(turns) or b"mp3")
+
+    assert language_audio(SCRIPT, "fr", style="interview") == b"mp3"
+    assert rendered == [[
+        ("host", "WHAT DID YOU FIND?"),
+        ("guest", "THAT WIDGETS WORK."),
+        ("host", "WHY?"),
+        ("guest", "BECAUSE OF GEARS."),
+    ]]
@@ -0,0 +1,63 @@
+import pytest
+
+from paper_document import SECTION_NAMES, PaperDocument
+
+TEXT = "Widgets help. Abstract: widgets reduce error. Methods: we built widgets. We found a 3x gain."
+ABSTRACT = (14, 45)
+METHODS = (46, 72)
+SENTENCES = [(0, 13), (14, 45), (46, 72), (73, 92)]
+
+
+def _document():
+    return PaperDocument.from_spans(TEXT, {"title": "Widgets", "year": "2021"},
+                                    {"abstract": ABSTRACT, "methods": METHODS}, SENTENCES, [1, 3],
+                                    "arxiv:2103.01234")
+
+
+def test_sections_are_sliced_from_the_text():
+    doc = _document()
+    assert doc.sections["abstract"] == "Abstract: widgets reduce error."
+    assert doc.sections.span("methods") == METHODS
+    assert list(doc.sections) == list(SECTION_NAMES)
+    # Sections that were not found are empty, unknown names are errors
+    assert doc.sections["results"] == ""
+    with pytest.raises(KeyError):
+        doc.sections["appendix"]
+
+
+def test_sentences_and_findings_are_lazy_views():
+    doc = _document()
+    assert len(doc.sentences) == 4
+    assert doc.sentences[0] == "Widgets help."
+    assert doc.sentences[-1] == "We found a 3x gain."
+    assert doc.sentences[1:3] == ["Abstract: widgets reduce error.", "Methods: we built widgets."]
+    assert list(doc.findings) == ["Abstract: widgets reduce error.", "We found a 3x gain."]
+    assert doc.findings.span(1) == SENTENCES[3]
+    with pytest.raises(IndexError):
+        doc.findings[2]
+
+
+def test_bytes_round_trip():
+    doc = _document()
+    restored = PaperDocument.from_bytes(doc.to_bytes())
+
+    assert restored.text == doc.text
+    assert restored.metadata == doc.metadata
+    assert restored.source_key == "arxiv:2103.01234"
+    assert dict(restored.sections) == dict(doc.sections)
+    assert list(restored.sentences) == list(doc.sentences)
+    assert list(restored.findings) == list(doc.findings)
+
+
+def test_round_trip_keeps_non_ascii_offsets_aligned():
+    text = "Über résumé naïve. Second sentence."
+    doc = PaperDocument.from_spans(text, {}, {"abstract": (0, 18)}, [(0, 18), (19, 35)], [1])
+    restored = PaperDocument.from_bytes(doc.to_bytes())
+    assert restored.sections["abstract"] == "Über résumé naïve."
+    assert restored.findings[0] == "Second sentence."
+
+
+def test_analysis_is_rebuilt_from_stored_offsets():
+    restored = PaperDocument.from_bytes(_document().to_bytes())
+    assert restored.analysis.text is restored.text
+    assert len(restored.analysis) == 4
@@ -0,0 +1,57 @@
+import pytest
+
+from paper_document import PaperDocument
+from paper_library import PaperLibrary, arxiv_source_key
+from text_analysis import analyze
+
+TEXT = "Widgets improve recall. We found widgets reduce error significantly."
+
+
+def _document(source_key, title):
+    return PaperDocument.from_analysis(analyze(TEXT), {"title": title}, {"abstract": (0, len(TEXT))}, [1],
+                                       source_key)
+
+
+@pytest.fixture
+def library(tmp_path):
+    return PaperLibrary(str(tmp_path / "library.db"))
+
+
+def test_papers_round_trip(library):
+    paper_id = library.add_paper(_document("arxiv:2101.00001", "Widgets"))
+
+    assert library.find_paper("arxiv:2101.00001") == paper_id
+    reopened = library.load_paper(paper_id)
+    assert reopened.text == TEXT
+    assert reopened.metadata["title"] == "Widgets"
+
+
+def test_re_adding_a_paper_keeps_its_id(library):
+    first = library.add_paper(_document("k", "Old title"))
+    second = library.add_paper(_document("k", "New title"))
+
+    assert first == second
+    assert library.load_paper(first).metadata["title"] == "New title"
+
+
+def test_duplicate_keys_in_a_batch_are_stored_once(library):
+    ids = library.add_papers([_document("k1", "Widgets"), _document("k2", "Gears"), _document("k1", "Widgets 2")])
+
+    assert ids[0] == ids[2] != ids[1]
+    hits = library.search("widgets")
+    assert len({(hit["paper_id"], hit["kind"], hit["name"]) for hit in hits}) == len(hits)
+
+
+def test_search_finds_sections_and_findings(library):
+    library.add_paper(_document("k1", "Widgets"))
+    assert library.search("recall")
+    assert not library.search("zebra")
+
+
+def test_arxiv_keys_ignore_versions():
+    assert arxiv_source_key("2101.00001v3") == arxiv_source_key("2101.00001")
+
+
+def test_in_memory_library_is_rejected():
+    with pytest.raises(ValueError):
+        PaperLibrary(":memory:")
@@ -0,0 +1,73 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("arxiv")
+pytest.importorskip("PyPDF2")
+pytest.importorskip("bs4")
+
+from paper_processor import ScientificPaperProcessor  # noqa: E402
+
+
+@pytest.fixture
+def processor():
+    return ScientificPaperProcessor()
+
+
+def _pdf(first_page_lines, info=None, last_page_text=None):
+    """Build a small PDF in memory; each line is (text, font size)."""
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 72
+    for text, size in first_page_lines:
+        page.insert_text((72, y), text, fontsize=size)
+        y += size + 8
+    if last_page_text is not None:
+        doc.new_page().insert_text((72, 72), last_page_text, fontsize=10)
+    if info:
+        doc.set_metadata(info)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_title_comes_from_the_largest_font_on_page_one(processor):
+    pdf = _pdf([("Widgets Considered Helpful", 20), ("Jane Doe, John Roe", 11), ("Abstract. Widgets work.", 10)],
+               info={"title": "draft_v3.docx", "author": "Jane Doe"})
+    metadata = processor.extract_pdf_metadata(pdf)
+    assert metadata["title"] == "Widgets Considered Helpful"
+    assert metadata["authors"] == "Jane Doe"
+
+
+def test_doi_and_arxiv_id_are_read_from_the_first_and_last_pages(processor):
+    pdf = _pdf([("Widgets Considered Helpful", 20), ("arXiv:2103.01234v2 [cs.LG]", 10)],
+               last_page_text="Published as doi:10.1145/3290605.3300233.")
+    metadata = processor.extract_pdf_metadata(pdf)
+    assert metadata["arxiv_id"] == "2103.01234"
+    assert metadata["doi"] == "10.1145/3290605.3300233"
+    assert metadata["year"] == "2021"
+
+
+def test_unreadable_pdf_yields_empty_metadata(processor):
+    assert processor.extract_pdf_metadata(b"not a pdf") == processor._empty_metadata()
+
+
+def test_year_prefers_the_arxiv_id(processor):
+    assert processor._guess_year("1906.00001", "Copyright 2015", "D:20230101") == "2019"
+
+
+def test_year_prefers_copyright_lines_over_other_years(processor):
+    page = "We compare against results from 1998.\n© 2017 The Authors."
+    assert processor._guess_year("", page, "D:20230101") == "2017"
+
+
+def test_year_falls_back_to_creation_date_then_any_year(processor):
+    assert processor._guess_year("", "We compare against results from 1998.", "D:20230101120000") == "2023"
+    assert processor._guess_year("", "We compare against results from 1998.", "") == "1998"
+    assert processor._guess_year("", "No dates here.", "") == ""
+
+
+def test_text_metadata_fallback_reads_only_head_and_tail(processor):
+    text = "Widgets Considered Helpful\n" + "filler " * 2000 + "doi:10.1000/xyz123"
+    metadata = processor.get_paper_metadata(text)
+    assert metadata["title"] == "Widgets Considered Helpful"
+    assert metadata["doi"] == "10.1000/xyz123"
@@ -0,0 +1,61 @@
+from concurrent.futures import Future
+
+from deadline import Deadline
+from paper_document import PaperDocument
+from podcast_generator import PodcastGenerator
+from text_analysis import analyze
+
+SENTENCE = "Widgets reduce the error of gear trains in every configuration we measured. "
+
+
+class StalledBatcher:
+    """Summarizer whose calls never finish."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, text, **options):
+        future = Future()
+        self.submitted.append(future)
+        return future
+
+
+def _paper(*names):
+    text, spans = "", {}
+    for name in names:
+        section = SENTENCE * 24  # a few 800-character chunks
+        spans[name] = (len(text), len(text) + len(section))
+        text += section
+    return PaperDocument.from_analysis(analyze(text), {"title": "Widgets"}, spans, [])
+
+
+def test_episode_description_counts_as_a_stage_when_the_script_skips_the_abstract(monkeypatch):
+    generator = PodcastGenerator(engine="extractive")
+    stages = []
+    monkeypatch.setattr(generator.policy, "begin", lambda names: stages.extend(names))
+    generator.generate_podcast_script(_paper("abstract", "introduction", "methods"), "storytelling")
+    assert stages == ["introduction", "methods", "abstract"]
+
+
+def test_abstract_is_counted_once_when_the_script_uses_it(monkeypatch):
+    generator = PodcastGenerator(engine="extractive")
+    stages = []
+    monkeypatch.setattr(generator.policy, "begin", lambda names: stages.extend(names))
+    generator.generate_podcast_script(_paper("abstract", "introduction"), "news")
+    assert stages == ["abstract", "introduction"]
+
+
+def test_deadline_hit_falls_back_to_extractive_and_is_recorded_once():
+    generator = PodcastGenerator(Deadline(0.3))
+    generator.batcher = StalledBatcher()
+    generator.policy.seconds_per_token = 1e-6  # plan full summaries so the deadline is hit mid-section
+    paper = _paper("abstract")
+    generator._document = paper
+    generator.policy.begin(["abstract"])
+
+    summary = generator._summarize_for_podcast(paper.sections["abstract"], "abstract")
+
+    assert summary
+    assert generator.policy.degradations == ["abstract: deadline hit, used extractive summary"]
+    # Chunks still waiting for the model were withdrawn
+    assert all(future.cancelled() for future in generator.batcher.submitted)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, job_key, normalize_source
+
+
+def _run_concurrently(flights, key, fn, callers):
+    results, errors = [], []
+    start = threading.Barrier(callers)
+
+    def call():
+        start.wait()
+        try:
+            results.append(flights.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    results, errors = _run_concurrently(flights, "key", work, 5)
+
+    assert results == ["result"] * 5
+    assert not errors
+    assert len(calls) == 1
+    assert not flights.in_flight("key")
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+
+    def work():
+        time.sleep(0.2)
+        raise ValueError("bad input")
+
+    results, errors = _run_concurrently(flights, "key", work, 3)
+
+    assert not results
+    assert len(errors) == 3
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_nothing_is_cached_after_the_call():
+    flights = SingleFlight()
+    calls = []
+    flights.do("key", calls.append, 1)
+    flights.do("key", calls.append, 2)
+
+    assert calls == [1, 2]
+
+
+def test_followers_retry_when_the_leader_is_interrupted():
+    flights = SingleFlight()
+    leader_started = threading.Event()
+    follower_result = []
+
+    def interrupted():
+        leader_started.set()
+        time.sleep(0.1)
+        raise KeyboardInterrupt
+
+    def leader():
+        with pytest.raises(KeyboardInterrupt):
+            flights.do("key", interrupted)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    leader_started.wait()
+    follower_result.append(flights.do("key", lambda: "retried"))
+    thread.join()
+
+    assert follower_result == ["retried"]
+
+
+def test_job_keys_normalize_sources():
+    assert normalize_source("https://arxiv.org/abs/2101.00001v2") == "arxiv:2101.00001"
+    assert normalize_source("arXiv:2101.00001") == "arxiv:2101.00001"
+    assert normalize_source("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "youtube:dQw4w9WgXcQ"
+    assert normalize_source("https://youtu.be/dQw4w9WgXcQ") == "youtube:dQw4w9WgXcQ"
+    assert normalize_source(b"%PDF").startswith("sha256:")
+    assert job_key("podcast", "2101.00001", style="news") == job_key("podcast", "arXiv:2101.00001v1", style="news")
+    assert job_key("podcast", "2101.00001", style="news") != job_key("podcast", "2101.00001", style="interview")
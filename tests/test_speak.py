@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("gtts")
+
+from speak import parse_speaker_turns  # noqa: E402
+
+
+def test_questions_go_to_the_host_and_answers_to_the_guest():
+    script = "Q: What did you find?\nA: That widgets work.\nQ: Why?\nA: Because of gears."
+    assert parse_speaker_turns(script) == [
+        ("host", "What did you find?"),
+        ("guest", "That widgets work."),
+        ("host", "Why?"),
+        ("guest", "Because of gears."),
+    ]
+
+
+def test_unmarked_lines_continue_the_current_speaker():
+    script = "A: First part.\nsecond part.\n\nQ: Next question?"
+    assert parse_speaker_turns(script) == [
+        ("guest", "First part. second part."),
+        ("host", "Next question?"),
+    ]
+
+
+def test_narration_before_the_first_marker_is_read_by_the_host():
+    script = "Welcome to the show.\nQ: Ready?\nA: Yes."
+    assert parse_speaker_turns(script) == [
+        ("host", "Welcome to the show. Ready?"),
+        ("guest", "Yes."),
+    ]
+
+
+def test_empty_script_has_no_turns():
+    assert parse_speaker_turns("\n\n") == []
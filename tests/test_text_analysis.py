@@ -0,0 +1,50 @@
+from text_analysis import TextAnalysis, analyze, segment_sentences
+
+
+def _sentences(text):
+    offsets = segment_sentences(text)
+    return [text[offsets[i]:offsets[i + 1]] for i in range(0, len(offsets), 2)]
+
+
+def test_abbreviations_initials_and_decimals_do_not_split():
+    text = "See Fig. 3 by J. Smith et al. for details. Accuracy rose by 3.5 points. Next one."
+    assert _sentences(text) == [
+        "See Fig. 3 by J. Smith et al. for details.",
+        "Accuracy rose by 3.5 points.",
+        "Next one.",
+    ]
+
+
+def test_line_breaks_end_sentences():
+    assert _sentences("Title line\nBody sentence.") == ["Title line", "Body sentence."]
+
+
+def test_chunks_pack_whole_sentences():
+    text = " ".join(f"Sentence number {i} is here." for i in range(20))
+    chunks = TextAnalysis(text).sentences().chunks(100)
+    assert all(len(chunk.text) <= 100 for chunk in chunks)
+    assert " ".join(chunk.text for chunk in chunks) == text
+
+
+def test_oversized_sentences_are_split_on_word_boundaries():
+    table = " ".join(f"cell{i}" for i in range(300))
+    text = f"Short intro. {table} end. Closing remark."
+    chunks = TextAnalysis(text).sentences().chunks(200)
+
+    assert all(len(chunk.text) <= 200 for chunk in chunks)
+    # Nothing is dropped and no word is cut in half
+    assert " ".join(chunk.text for chunk in chunks).split() == text.split()
+
+
+def test_analysis_is_shared_per_text():
+    text = "A shared text. With two sentences."
+    assert analyze(text) is analyze(text)
+    assert analyze(text).memo("answer", lambda: 42) == 42
+    assert analyze(text).memo("answer", lambda: 0) == 42
+
+
+def test_features():
+    analysis = TextAnalysis("We found a significant effect of 12 percent. Nothing else.")
+    first, second = analysis.features(0), analysis.features(1)
+    assert first.has_number and first.finding_cue
+    assert not second.has_number and not second.finding_cue
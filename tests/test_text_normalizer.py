@@ -0,0 +1,66 @@
+from text_normalizer import TextNormalizer, normalize_text
+
+
+def _pages(*pages):
+    return "\f".join(pages)
+
+
+def test_wrapped_lines_are_joined_and_hyphenation_repaired():
+    text = "This paragraph was wrapped by the PDF and a hyphen-\nated word was split across\nlines in the middle."
+    assert normalize_text(text) == (
+        "This paragraph was wrapped by the PDF and a hyphenated word was split across lines in the middle."
+    )
+
+
+def test_headings_stay_on_their_own_line():
+    blocks = normalize_text("1. Introduction\nDeep models are large.\n\nResults\nThey work well.").split("\n")
+    assert blocks == ["1. Introduction", "Deep models are large.", "Results", "They work well."]
+
+
+def test_ligatures_and_symbols_are_normalized():
+    assert normalize_text("The ﬁrst eﬀect — measured at 3 K • twice.") == (
+        "The first effect - measured at 3 K twice."
+    )
+
+
+def test_slashes_survive_for_dois():
+    assert "10.1145/3290605" in normalize_text("DOI: 10.1145/3290605.3300233")
+
+
+def test_running_headers_and_page_numbers_are_dropped():
+    text = _pages(
+        "Journal of Widgets\nFirst page body text.\n1",
+        "Journal of Widgets\nSecond page body text.\n2",
+        "Journal of Widgets\nThird page body text.\nPage 3 of 3",
+    )
+    normalized = normalize_text(text)
+    # Only the first occurrence of the running header survives
+    assert normalized.count("Journal of Widgets") == 1
+    assert "Page 3" not in normalized
+    assert normalized.endswith("First page body text. Second page body text. Third page body text.")
+
+
+def test_years_and_values_in_the_margins_are_kept():
+    text = _pages(
+        "Data collected in\n2019\nFirst page body text.\nSee the table.\n42",
+        "Second page body text.\nCollected in\n2020",
+    )
+    normalized = normalize_text(text)
+    assert "2019" in normalized
+    assert "42" in normalized
+    assert "2020" in normalized
+
+
+def test_journal_page_numbers_continuing_across_pages_are_dropped():
+    text = _pages("1043\nBody one.", "1044\nBody two.", "1045\nBody three.")
+    normalized = normalize_text(text)
+    assert "1044" not in normalized
+    assert "1045" not in normalized
+
+
+def test_pages_can_be_streamed():
+    normalizer = TextNormalizer()
+    blocks = list(normalizer.feed("A paragraph that continues"))
+    assert blocks == []
+    blocks = list(normalizer.feed("on the next page.")) + list(normalizer.close())
+    assert blocks == ["A paragraph that continues on the next page."]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from textrank import rank_sentences, summarize_extractive
+
+
+def test_scores_form_a_distribution():
+    tokenized = [("neural", "widget"), ("widget", "gear"), ("gear", "neural"), ("weather", "rain")]
+    scores = rank_sentences(tokenized)
+    assert scores.shape == (4,)
+    assert np.isclose(scores.sum(), 1.0)
+
+
+def test_central_sentences_rank_highest():
+    tokenized = [
+        ("widget", "gear", "spring"),
+        ("widget", "gear"),
+        ("widget", "spring"),
+        ("gear", "spring"),
+        ("weather", "rain"),
+    ]
+    scores = rank_sentences(tokenized, max_df=1.0)
+    assert int(np.argmax(scores)) == 0
+    assert int(np.argmin(scores)) == 4
+
+
+def test_trivial_inputs():
+    assert rank_sentences([]).shape == (0,)
+    assert np.allclose(rank_sentences([("a",), ("b",)]), [0.5, 0.5])
+    # No shared terms: every sentence teleports, so scores are uniform
+    assert np.allclose(rank_sentences([("a",), ("b",), ("c",)]), 1 / 3)
+
+
+def test_long_inputs_with_common_terms_stay_cheap():
+    rng = np.random.default_rng(0)
+    vocabulary = [f"term{i}" for i in range(30)]
+    tokenized = [tuple(rng.choice(vocabulary, size=8)) for _ in range(20000)]
+    scores = rank_sentences(tokenized, max_df=1.0)
+    assert np.isclose(scores.sum(), 1.0)
+
+
+def test_summary_keeps_original_order():
+    text = ("Widgets are small gears. The weather was rainy. Widgets and gears turn together. "
+            "Lunch was served at noon. Gears drive widgets in every machine.")
+    summary = summarize_extractive(text, num_sentences=2)
+    sentences = summary.split(". ")
+    assert len(sentences) == 2
+    assert text.index(sentences[0]) < text.index(sentences[1].rstrip("."))
+
+
+def test_short_texts_are_returned_whole():
+    assert summarize_extractive("One sentence. Two sentences.", num_sentences=3) == "One sentence. Two sentences."
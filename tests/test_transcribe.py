@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("whisper")
+pytest.importorskip("yt_dlp")
+
+import transcribe  # noqa: E402
+from transcribe import LocalFileFetcher, download_youtube_audio, iter_windows, transcribe_window  # noqa: E402
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class CountingFetcher(LocalFileFetcher):
+    def __init__(self, source_dir):
+        super().__init__(source_dir)
+        self.calls = 0
+
+    def fetch(self, url, out_base):
+        self.calls += 1
+        return super().fetch(url, out_base)
+
+
+def test_download_is_cached_by_video_id(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "dQw4w9WgXcQ.webm").write_bytes(b"audio")
+    fetcher = CountingFetcher(str(source))
+    cache_dir = str(tmp_path / "cache")
+
+    first = download_youtube_audio(URL, cache_dir=cache_dir, fetcher=fetcher)
+    second = download_youtube_audio("https://youtu.be/dQw4w9WgXcQ", cache_dir=cache_dir, fetcher=fetcher)
+
+    assert first == second == os.path.join(cache_dir, "dQw4w9WgXcQ.webm")
+    assert fetcher.calls == 1
+    # Only the finished file is left in the cache
+    assert os.listdir(cache_dir) == ["dQw4w9WgXcQ.webm"]
+
+
+def test_missing_local_audio_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        download_youtube_audio(URL, cache_dir=str(tmp_path / "cache"), fetcher=LocalFileFetcher(str(tmp_path)))
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        download_youtube_audio(URL, mode="wav", cache_dir=str(tmp_path))
+
+
+RATE = 16000
+
+
+def test_windows_overlap_and_cover_all_samples(monkeypatch):
+    monkeypatch.setattr(transcribe.whisper.audio, "SAMPLE_RATE", RATE)
+    samples = np.arange(25 * RATE, dtype=np.float32)
+    windows = list(iter_windows(samples, window_seconds=10, overlap_seconds=2))
+
+    starts = [int(window[0]) for window, _, _ in windows]
+    assert starts == [0, 8 * RATE, 16 * RATE]
+    assert [len(window) for window, _, _ in windows] == [10 * RATE, 10 * RATE, 9 * RATE]
+    assert int(windows[-1][0][-1]) == len(samples) - 1
+    # Windows are views into the samples, not copies
+    assert all(np.shares_memory(window, samples) for window, _, _ in windows)
+
+
+def test_seams_are_cut_in_the_middle_of_the_overlap(monkeypatch):
+    monkeypatch.setattr(transcribe.whisper.audio, "SAMPLE_RATE", RATE)
+    windows = list(iter_windows(np.zeros(25 * RATE, dtype=np.float32), window_seconds=10, overlap_seconds=2))
+    bounds = [(keep_from, keep_until) for _, keep_from, keep_until in windows]
+    assert bounds == [(0.0, 9.0), (1.0, 9.0), (1.0, None)]
+
+    # In absolute time, each window keeps up to where the next one starts keeping
+    starts = [0, 8, 16]
+    for i in range(len(bounds) - 1):
+        assert starts[i] + bounds[i][1] == starts[i + 1] + bounds[i + 1][0]
+
+
+def test_short_audio_is_one_window(monkeypatch):
+    monkeypatch.setattr(transcribe.whisper.audio, "SAMPLE_RATE", RATE)
+    windows = list(iter_windows(np.zeros(3 * RATE, dtype=np.float32), window_seconds=10, overlap_seconds=2))
+    assert [(len(w), keep_from, keep_until) for w, keep_from, keep_until in windows] == [(3 * RATE, 0.0, None)]
+
+
+class FakeWhisper:
+    def transcribe(self, samples, initial_prompt=None, word_timestamps=False):
+        assert word_timestamps
+        return {"segments": [{"words": [
+            {"word": " half", "start": 0.4},
+            {"word": " kept", "start": 1.2},
+            {"word": " words", "start": 5.0},
+            {"word": " seam", "start": 9.5},
+        ]}]}
+
+
+def test_only_words_inside_the_kept_range_are_returned(monkeypatch):
+    monkeypatch.setattr(transcribe, "get_whisper", lambda size: FakeWhisper())
+    samples = np.zeros(10 * RATE, dtype=np.float32)
+    assert transcribe_window(samples, keep_from=1.0, keep_until=9.0) == "kept words"
+    assert transcribe_window(samples) == "half kept words seam"
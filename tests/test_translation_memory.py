@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from translation_memory import TranslationMemory, normalize_segment
+
+
+@pytest.fixture
+def memory(tmp_path):
+    tm = TranslationMemory(str(tmp_path / "tm.db"), max_entries=3)
+    yield tm
+    tm.close()
+
+
+def test_stored_sentences_are_looked_up(memory):
+    memory.store("en", "fr", "marian", [("Welcome to the show.", "Bienvenue dans l'émission.")])
+
+    found = memory.lookup("en", "fr", "marian", ["Welcome to the show.", "Goodbye."])
+    assert found == {"Welcome to the show.": "Bienvenue dans l'émission."}
+    assert memory.stats() == {"entries": 1, "hits": 1}
+
+
+def test_entries_are_scoped_by_language_pair_and_model(memory):
+    memory.store("en", "fr", "marian", [("Hello.", "Bonjour.")])
+    assert memory.lookup("en", "de", "marian", ["Hello."]) == {}
+    assert memory.lookup("en", "fr", "nllb", ["Hello."]) == {}
+
+
+def test_sentences_are_normalized_before_keying(memory):
+    memory.store("en", "fr", "marian", [(normalize_segment("  Hello   there. "), "Salut.")])
+    assert memory.lookup("en", "fr", "marian", [normalize_segment("Hello there.")]) == {"Hello there.": "Salut."}
+
+
+def test_least_recently_used_entries_are_evicted(memory):
+    for sentence in ("One.", "Two.", "Three."):
+        memory.store("en", "fr", "marian", [(sentence, sentence.upper())])
+        time.sleep(0.01)
+    # A hit refreshes "One.", so "Two." is now the least recently used
+    memory.lookup("en", "fr", "marian", ["One."])
+    time.sleep(0.01)
+    memory.store("en", "fr", "marian", [("Four.", "FOUR.")])
+
+    assert memory.stats()["entries"] == 3
+    assert set(memory.lookup("en", "fr", "marian", ["One.", "Two.", "Three.", "Four."])) == {"One.", "Three.", "Four."}
+
+
+def test_entries_are_shared_across_threads(memory):
+    memory.store("en", "fr", "marian", [("Hello.", "Bonjour.")])
+    found = []
+    thread = threading.Thread(target=lambda: found.append(memory.lookup("en", "fr", "marian", ["Hello."])))
+    thread.start()
+    thread.join()
+    assert found == [{"Hello.": "Bonjour."}]
+
+
+def test_in_memory_database_is_rejected():
+    with pytest.raises(ValueError):
+        TranslationMemory(":memory:")
@@ -0,0 +1,55 @@
+import os
+import threading
+import time
+
+from tts_cache import SegmentCache, segment_key
+
+
+def test_segments_round_trip(tmp_path):
+    cache = SegmentCache(str(tmp_path))
+    key = segment_key("Welcome to the show.", "en", "com", "gtts")
+
+    assert cache.get(key) is None
+    cache.put(key, b"mp3")
+    assert cache.get(key) == b"mp3"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_keys_ignore_whitespace_but_not_voice():
+    assert segment_key("Hello  there.", "en", "com", "gtts") == segment_key("Hello there.", "en", "com", "gtts")
+    assert segment_key("Hello there.", "en", "com", "gtts") != segment_key("Hello there.", "en", "co.uk", "gtts")
+
+
+def test_least_recently_used_segments_are_evicted(tmp_path):
+    cache = SegmentCache(str(tmp_path), max_bytes=5000)
+    keys = [segment_key(f"sentence {i}", "en", "com", "gtts") for i in range(8)]
+    for key in keys[:5]:
+        cache.put(key, b"x" * 1000)
+        time.sleep(0.01)
+    cache.get(keys[0])  # recently used, so it survives
+    time.sleep(0.01)
+    cache.put(keys[5], b"x" * 1000)
+
+    assert os.path.exists(cache.path(keys[0]))
+    assert not os.path.exists(cache.path(keys[1]))
+    assert cache.stats()["bytes"] <= 5000
+
+
+def test_hit_and_miss_counts_are_exact_under_concurrency(tmp_path):
+    cache = SegmentCache(str(tmp_path))
+    key = segment_key("Welcome to the show.", "en", "com", "gtts")
+    cache.put(key, b"mp3")
+    missing = segment_key("Never stored.", "en", "com", "gtts")
+
+    def read():
+        for _ in range(200):
+            cache.get(key)
+            cache.get(missing)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1600, 1600)
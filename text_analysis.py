@@ -0,0 +1,300 @@
+import hashlib
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = frozenset("""
+al approx cf dr e.g eq eqs esp etc fig figs i.e jr mr mrs ms no nos prof ref refs resp sec sect sr st
+tab viz vol vs
+""".split())
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you
+your yours yourself yourselves also however thus et al
+""".split())
+
+# Cue phrases of sentences that state a key finding
+FINDING_CUES = re.compile(
+    r'we found|results show|study demonstrates|analysis reveals|significant|'
+    r'important|key finding|conclusion|implication',
+    re.IGNORECASE
+)
+
+# A line break, or terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_BOUNDARY_RE = re.compile(r'\n|[.!?]+["\')\]]*(?=\s|$)')
+_NEXT_CHAR_RE = re.compile(r'[ \t]*(\S)')
+_WORD_BEFORE_RE = re.compile(r'[(\[]?([\w.]+)$')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_NUMBER_RE = re.compile(r'\d')
+
+CACHE_SIZE = 32
+# Texts kept in the cache hold at most this many characters in total
+CACHE_MAX_CHARS = 8_000_000
+
+
+class SentenceFeatures(NamedTuple):
+    length: int          # characters
+    n_tokens: int        # content tokens (stopwords removed)
+    has_number: bool
+    finding_cue: bool    # contains a key-finding phrase
+
+
+def _is_sentence_end(text: str, start: int, end: int) -> bool:
+    """Decide whether the punctuation at text[start:end] ends a sentence."""
+    next_char = _NEXT_CHAR_RE.match(text, end)
+    if next_char and next_char.group(1).islower():
+        # "e.g. the", "approx. three": the sentence carries on
+        return False
+    if text[start] != '.' or end - start > 1 and text[start + 1] == '.':
+        return True
+
+    word = _WORD_BEFORE_RE.search(text, max(0, start - 16), start)
+    if word:
+        word = word.group(1)
+        if word.lower() in ABBREVIATIONS:
+            return False
+        if len(word) == 1 and word.isupper():
+            # Initial, as in "J. Smith"
+            return False
+    return True
+
+
+def segment_sentences(text: str) -> array:
+    """Split text into sentences in one scan; returns flat (start, end) offsets, whitespace trimmed.
+
+    Line breaks always end a sentence. Periods end one unless they follow an
+    abbreviation or an initial, or the next word is lowercase; decimals such
+    as "3.5" never match because no whitespace follows the point.
+    """
+    offsets = array('I')
+
+    def add(start, end):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            offsets.append(start)
+            offsets.append(end)
+
+    start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        if match.group() == '\n':
+            add(start, match.start())
+        elif _is_sentence_end(text, match.start(), match.end()):
+            add(start, match.end())
+        else:
+            continue
+        start = match.end()
+    add(start, len(text))
+    return offsets
+
+
+class TextAnalysis:
+    """Sentence-level analysis of one text, shared by every processing stage.
+
+    Sentences are segmented once and kept as offsets into the text. Tokens and
+    per-sentence features are computed the first time a stage asks for them
+    and memoized, as are document-level results stored with `memo`. Get a
+    shared instance with `analyze(text)` rather than constructing one.
+    """
+    __slots__ = ('text', '_offsets', '_starts', '_tokens', '_features', '_memo')
+
+    def __init__(self, text: str, sentence_offsets: Optional[array] = None):
+        self.text = text
+        self._offsets = sentence_offsets if sentence_offsets is not None else segment_sentences(text)
+        self._starts = None
+        self._tokens: List[Optional[Tuple[str, ...]]] = [None] * (len(self._offsets) // 2)
+        self._features: List[Optional[SentenceFeatures]] = [None] * len(self._tokens)
+        self._memo: Dict = {}
+
+    @property
+    def offsets(self) -> array:
+        """Flat (start, end) sentence offsets."""
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self._offsets[2 * index], self._offsets[2 * index + 1]
+
+    def sentence(self, index: int) -> str:
+        start, end = self.span(index)
+        return self.text[start:end]
+
+    def tokens(self, index: int) -> Tuple[str, ...]:
+        """Lowercased content tokens of sentence `index`."""
+        tokens = self._tokens[index]
+        if tokens is None:
+            tokens = self._tokens[index] = tuple(
+                t for t in _TOKEN_RE.findall(self.sentence(index).lower())
+                if t not in STOPWORDS and len(t) > 1
+            )
+        return tokens
+
+    def features(self, index: int) -> SentenceFeatures:
+        features = self._features[index]
+        if features is None:
+            start, end = self.span(index)
+            features = self._features[index] = SentenceFeatures(
+                length=end - start,
+                n_tokens=len(self.tokens(index)),
+                has_number=bool(_NUMBER_RE.search(self.text, start, end)),
+                finding_cue=bool(FINDING_CUES.search(self.text, start, end)),
+            )
+        return features
+
+    def sentences(self, start: int = 0, end: Optional[int] = None) -> 'SentenceRange':
+        """The sentences starting inside text[start:end], as a view."""
+        if start == 0 and end is None:
+            return SentenceRange(self, 0, len(self))
+        if self._starts is None:
+            self._starts = self._offsets[0::2]
+        first = bisect_left(self._starts, start)
+        last = len(self) if end is None else bisect_left(self._starts, end)
+        return SentenceRange(self, first, last)
+
+    def memo(self, key, compute: Callable):
+        """Return a document-level result (keywords, sentiment, ...), computing it once."""
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def __repr__(self) -> str:
+        return f"TextAnalysis({len(self.text)} chars, {len(self)} sentences)"
+
+
+class SentenceRange(Sequence):
+    """Sentences first..last-1 of an analysis; nothing is copied or segmented again."""
+    __slots__ = ('analysis', 'first', 'last')
+
+    def __init__(self, analysis: TextAnalysis, first: int, last: int):
+        self.analysis = analysis
+        self.first = first
+        self.last = last
+
+    def __len__(self) -> int:
+        return self.last - self.first
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.first + index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.analysis.sentence(self._index(index))
+
+    def tokens(self, index: int) -> Tuple[str, ...]:
+        return self.analysis.tokens(self._index(index))
+
+    def features(self, index: int) -> SentenceFeatures:
+        return self.analysis.features(self._index(index))
+
+    @property
+    def text(self) -> str:
+        """The sentences joined by single spaces."""
+        return ' '.join(self)
+
+    def chunks(self, max_chars: int) -> List['SentenceRange']:
+        """Pack whole sentences into consecutive ranges of at most `max_chars` characters.
+
+        A sentence longer than `max_chars` (a table or reference list that was
+        extracted as one "sentence") is split on word boundaries into pieces of
+        its own, so nothing is lost to model truncation.
+        """
+        return self.analysis.memo(('chunks', self.first, self.last, max_chars), lambda: self._pack(max_chars))
+
+    def _pack(self, max_chars: int) -> List['SentenceRange']:
+        chunks = []
+        first, size = self.first, 0
+        for i in range(self.first, self.last):
+            length = self.analysis.features(i).length
+            if length > max_chars:
+                if i > first:
+                    chunks.append(SentenceRange(self.analysis, first, i))
+                chunks.extend(self._split_sentence(i, max_chars))
+                first, size = i + 1, 0
+                continue
+            if i > first and size + 1 + length > max_chars:
+                chunks.append(SentenceRange(self.analysis, first, i))
+                first, size = i, 0
+            size += length + (1 if size else 0)
+        if first < self.last:
+            chunks.append(SentenceRange(self.analysis, first, self.last))
+        return chunks
+
+    def _split_sentence(self, index: int, max_chars: int) -> List['SentenceRange']:
+        """Pieces of an oversized sentence, cut at the last space before `max_chars`."""
+        text = self.analysis.text
+        start, end = self.analysis.span(index)
+        offsets = array('I')
+        while start < end:
+            cut = end
+            if end - start > max_chars:
+                cut = text.rfind(' ', start + 1, start + max_chars + 1)
+                if cut <= start:
+                    cut = start + max_chars  # one enormous token
+            offsets.append(start)
+            offsets.append(cut)
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        # The pieces are sentences of a view on the same text; nothing is copied
+        pieces = TextAnalysis(text, offsets)
+        return [SentenceRange(pieces, i, i + 1) for i in range(len(pieces))]
+
+    def __repr__(self) -> str:
+        return f"SentenceRange({self.first}:{self.last})"
+
+
+_cache: 'OrderedDict[bytes, TextAnalysis]' = OrderedDict()
+_cache_chars = 0
+_cache_lock = threading.Lock()
+
+
+def _cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def analyze(text: str, sentence_offsets: Optional[array] = None) -> TextAnalysis:
+    """Shared analysis of `text`; the most recent texts are kept.
+
+    The cache is keyed by a digest of the text and bounded both by entries
+    (CACHE_SIZE) and by the characters of the texts it holds (CACHE_MAX_CHARS).
+    Pass `sentence_offsets` when the segmentation is already known (e.g. a
+    stored paper) to skip segmenting.
+    """
+    global _cache_chars
+    key = _cache_key(text)
+    with _cache_lock:
+        analysis = _cache.get(key)
+        if analysis is not None:
+            _cache.move_to_end(key)
+            return analysis
+
+    analysis = TextAnalysis(text, sentence_offsets)
+    with _cache_lock:
+        if key in _cache:
+            analysis = _cache[key]
+        else:
+            _cache[key] = analysis
+            _cache_chars += len(text)
+        _cache.move_to_end(key)
+        while len(_cache) > 1 and (len(_cache) > CACHE_SIZE or _cache_chars > CACHE_MAX_CHARS):
+            _cache_chars -= len(_cache.popitem(last=False)[1].text)
+    return analysis
@@ -0,0 +1,165 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+# Punctuation kept by the normalizer ('/' for DOIs, URLs and "3/12" page marks); any other symbol becomes a space
+_KEEP_PUNCTUATION = set(".,;:!?-()[]_/")
+
+# Fixed replacements applied before filtering (ligatures, dashes, invisible characters)
+_BASE_TABLE = {
+    0x00A0: " ",     # no-break space
+    0x00AD: None,    # soft hyphen
+    0x200B: None,    # zero-width space
+    0xFB00: "ff", 0xFB01: "fi", 0xFB02: "fl", 0xFB03: "ffi", 0xFB04: "ffl",
+    0x2010: "-", 0x2011: "-", 0x2012: "-", 0x2013: "-", 0x2014: "-", 0x2212: "-",
+    0x2018: None, 0x2019: None, 0x201C: None, 0x201D: None,
+    0x000C: "\n",    # form feed
+}
+
+_SPACES_RE = re.compile(r'[ \t\r\v]+')
+# "Page 3", "Page 3 of 12", "3 of 12", "3/12": unmistakably page labels
+_PAGE_LABEL_RE = re.compile(r'^(page\s*\d{1,4}|\d{1,4}\s*(of|/)\s*\d{1,4}|page\s*\d{1,4}\s*(of|/)\s*\d{1,4})$',
+                            re.IGNORECASE)
+# A bare number is only a page number if it fits the page sequence
+_BARE_NUMBER_RE = re.compile(r'^\d{1,4}$')
+_SECTION_HEADING_RE = re.compile(
+    r'^((\d{1,2}|[IVX]{1,4})(\.\d{1,2})*\.?\s+)?'
+    r'(abstract|summary|introduction|background|related work|methods?|methodology|'
+    r'materials and methods|experimental|experiments|results|findings|discussion|'
+    r'conclusions?|acknowledge?ments|references|bibliography|appendix)\b([\w ]{0,40})$',
+    re.IGNORECASE
+)
+_NUMBERED_HEADING_RE = re.compile(r'^\d{1,2}(\.\d{1,2})*\.?\s+[A-Z][^.!?]{0,70}$')
+_SIGNATURE_RE = re.compile(r'\d+')
+
+
+class _CharFilter(dict):
+    """str.translate table built lazily: each code point is classified once, then cached."""
+
+    def __missing__(self, codepoint: int):
+        ch = chr(codepoint)
+        value = codepoint if (ch.isalnum() or ch.isspace() or ch in _KEEP_PUNCTUATION) else " "
+        self[codepoint] = value
+        return value
+
+
+_CHAR_TABLE = _CharFilter(str.maketrans(_BASE_TABLE))
+
+
+class TextNormalizer:
+    """Single-pass, page-at-a-time cleaner for extracted PDF text.
+
+    Each page is filtered with one translate() call, running headers/footers
+    and page numbers are dropped from the page margins, and wrapped lines are
+    joined into paragraphs. Headings and paragraphs are emitted one per line,
+    so later stages can still see section boundaries. Only the current page
+    and the paragraph being assembled are held in memory.
+    """
+
+    def __init__(self, margin_lines: int = 2, max_signatures: int = 256):
+        self.margin_lines = margin_lines
+        self.max_signatures = max_signatures
+        self._margin_signatures: Dict[str, int] = {}
+        self._paragraph: List[str] = []
+        self._page = 0
+        self._previous_numbers: Set[Tuple[bool, int]] = set()
+
+    def normalize_pages(self, pages: Iterable[str]) -> Iterator[str]:
+        """Yield normalized blocks (headings and paragraphs) for a stream of pages."""
+        for page in pages:
+            yield from self.feed(page)
+        yield from self.close()
+
+    def normalize(self, text: str) -> str:
+        """Normalize a whole document; form feeds, if present, mark page breaks."""
+        return "\n".join(self.normalize_pages(text.split("\f")))
+
+    def feed(self, page: str) -> Iterator[str]:
+        """Normalize one page, yielding every block completed on it."""
+        lines = [_SPACES_RE.sub(" ", line).strip() for line in page.translate(_CHAR_TABLE).split("\n")]
+        lines = self._strip_margins(lines)
+        width = max((len(line) for line in lines), default=0)
+
+        for line in lines:
+            if not line:
+                yield from self._flush()
+                continue
+
+            if self._is_heading(line):
+                yield from self._flush()
+                yield line
+                continue
+
+            self._append(line)
+
+            # A short line ending a sentence usually closes the paragraph
+            if line[-1] in ".!?:" and len(line) < 0.6 * width:
+                yield from self._flush()
+
+    def close(self) -> Iterator[str]:
+        """Flush the paragraph still open at the end of the stream."""
+        yield from self._flush()
+
+    def _append(self, line: str):
+        if self._paragraph:
+            last = self._paragraph[-1]
+            # Re-join words hyphenated across a line break
+            if last.endswith("-") and len(last) > 1 and last[-2].isalpha() and line[0].islower():
+                self._paragraph[-1] = last[:-1] + line
+                return
+        self._paragraph.append(line)
+
+    def _flush(self) -> Iterator[str]:
+        if self._paragraph:
+            paragraph = " ".join(self._paragraph)
+            self._paragraph = []
+            yield paragraph
+
+    def _is_heading(self, line: str) -> bool:
+        if len(line) > 80 or not (line[0].isupper() or line[0].isdigit()):
+            return False
+
+        match = _SECTION_HEADING_RE.match(line)
+        if match:
+            # "Conclusion and Future Work" is a heading, "Results show that..." is not
+            tail = match.group(5).split()
+            return all(word[0].isupper() for word in tail if len(word) > 3)
+
+        # Numbered headings never interrupt a sentence in progress
+        sentence_open = self._paragraph and self._paragraph[-1][-1] not in ".!?:"
+        return not sentence_open and bool(_NUMBERED_HEADING_RE.match(line))
+
+    def _strip_margins(self, lines: List[str]) -> List[str]:
+        self._page += 1
+        content = [i for i, line in enumerate(lines) if line]
+        if not content:
+            self._previous_numbers = set()
+            return []
+
+        top = set(content[:self.margin_lines])
+        margin = top | set(content[-self.margin_lines:])
+        dropped = set()
+        numbers = set()
+        for i in margin:
+            line = lines[i]
+            if _BARE_NUMBER_RE.match(line):
+                # A year or table value in the margin stays; a number equal to the page's
+                # position, or continuing the previous page's number on the same side, goes
+                number = int(line)
+                numbers.add((i in top, number))
+                if number == self._page or (i in top, number - 1) in self._previous_numbers:
+                    dropped.add(i)
+                continue
+            signature = _SIGNATURE_RE.sub("#", line.lower())
+            seen = self._margin_signatures.get(signature, 0)
+            if _PAGE_LABEL_RE.match(line) or (seen and len(line) < 120):
+                dropped.add(i)
+            if len(self._margin_signatures) < self.max_signatures or seen:
+                self._margin_signatures[signature] = seen + 1
+
+        self._previous_numbers = numbers
+        return [line for i, line in enumerate(lines) if i not in dropped]
+
+
+def normalize_text(text: str) -> str:
+    """Convenience wrapper: normalize a complete document in one call."""
+    return TextNormalizer().normalize(text)
@@ -0,0 +1,99 @@
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+from text_analysis import SentenceRange, analyze
+
+
+def rank_sentences(tokenized: Sequence[Sequence[str]], damping: float = 0.85, max_df: float = 0.5,
+                   tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """Score sentences with PageRank over a sparse TF-IDF cosine-similarity graph.
+
+    The similarity graph W = X·Xᵀ (minus self-loops) is never materialized,
+    neither as an n x n matrix nor as a list of sentence pairs: every
+    PageRank step multiplies by X and Xᵀ in turn, so time and memory per step
+    are linear in the number of non-zero TF-IDF entries. Terms in more than
+    `max_df` of the sentences are ignored.
+    """
+    n = len(tokenized)
+    if n == 0:
+        return np.zeros(0)
+    if n <= 2:
+        return np.full(n, 1.0 / n)
+
+    # Sparse term-frequency matrix in COO form
+    vocab = {}
+    rows, cols, counts = [], [], []
+    for i, tokens in enumerate(tokenized):
+        tf = {}
+        for token in tokens:
+            term = vocab.setdefault(token, len(vocab))
+            tf[term] = tf.get(term, 0) + 1
+        rows.extend([i] * len(tf))
+        cols.extend(tf.keys())
+        counts.extend(tf.values())
+
+    if not cols:
+        return np.full(n, 1.0 / n)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+
+    # Sublinear TF-IDF with L2-normalized rows, so dot products are cosines
+    df = np.bincount(cols, minlength=len(vocab))
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    values = (1.0 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n))
+    values /= norms[rows]
+
+    # Keep terms shared by at least two sentences but not by most of them
+    keep = (df[cols] >= 2) & (df[cols] <= max(2, max_df * n))
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+    n_terms = len(vocab)
+    self_similarity = np.bincount(rows, weights=values ** 2, minlength=n)
+
+    def similarity(vector: np.ndarray) -> np.ndarray:
+        """W·vector with W = X·Xᵀ - diag(X·Xᵀ), as two sparse products."""
+        per_term = np.bincount(cols, weights=values * vector[rows], minlength=n_terms)
+        return np.bincount(rows, weights=values * per_term[cols], minlength=n) - self_similarity * vector
+
+
+    # Row-stochastic transitions W[i, j] / out_weight[i]; sentences without edges teleport uniformly
+    out_weight = similarity(np.ones(n))
+    dangling = out_weight <= 1e-12
+    inverse_out = np.where(dangling, 0.0, 1.0 / np.where(dangling, 1.0, out_weight))
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # W is symmetric, so spreading scores along out-edges is W·(scores / out_weight)
+        spread = similarity(scores * inverse_out)
+        updated = (1 - damping) / n + damping * (spread + scores[dangling].sum() / n)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def summarize_extractive(text: str, num_sentences: Optional[int] = None, ratio: float = 0.15,
+                         sentences: Optional[SentenceRange] = None) -> str:
+    """Extractive TextRank summary: the top-ranked sentences, in their original order.
+
+    Without `num_sentences`, keeps about `ratio` of the sentences (3 to 30).
+    Pass `sentences` (a range of a shared analysis) to reuse its segmentation and tokens.
+    """
+    if sentences is None:
+        sentences = analyze(text).sentences()
+    if not len(sentences):
+        return text.strip()
+
+    if num_sentences is None:
+        num_sentences = min(30, max(3, math.ceil(len(sentences) * ratio)))
+    if len(sentences) <= num_sentences:
+        return sentences.text
+
+    scores = rank_sentences([sentences.tokens(i) for i in range(len(sentences))])
+    top = np.sort(np.argsort(-scores, kind="stable")[:num_sentences])
+    return " ".join(sentences[i] for i in top)
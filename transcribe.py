@@ -1,33 +1,178 @@
 import whisper
 import yt_dlp
+import numpy as np
+import glob
 import os
+import shutil
+import tempfile
+import threading
+from models import get_whisper
+from source_ids import youtube_video_id
+
+# Downloaded audio is cached here by video ID, so repeat links skip the download
+YOUTUBE_CACHE_DIR = os.environ.get(
+    "SMARTCAST_YOUTUBE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "smartcast", "youtube"),
+)
+
+# Length of the audio windows transcribed one at a time by the streaming pipeline
+WINDOW_SECONDS = int(os.environ.get("SMARTCAST_WINDOW_SECONDS", "120"))
+# Consecutive windows share this much audio, so words at a boundary are heard whole by one of them
+OVERLAP_SECONDS = float(os.environ.get("SMARTCAST_WINDOW_OVERLAP", "5"))
+
+# One lock per video ID: identical links wait for each other, different ones run in parallel
+_download_locks = {}
+_download_locks_guard = threading.Lock()
+
+
+class YtDlpFetcher:
+    """Download the native audio stream with yt-dlp, without re-encoding it."""
+
+    def fetch(self, url, out_base):
+        ydl_opts = {
+            "format": "bestaudio/best",
+            "outtmpl": f"{out_base}.%(ext)s",
+            "quiet": True
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+            return ydl.prepare_filename(info)
+
+
+class LocalFileFetcher:
+    """Stand-in for yt-dlp that serves `<video_id>.<ext>` files from a local directory."""
+
+    def __init__(self, source_dir):
+        self.source_dir = source_dir
+
+    def fetch(self, url, out_base):
+        video_id = youtube_video_id(url)
+        matches = sorted(glob.glob(os.path.join(self.source_dir, f"{video_id}.*")))
+        if not matches:
+            raise FileNotFoundError(f"No local audio for video {video_id} in {self.source_dir}")
+        target = out_base + os.path.splitext(matches[0])[1]
+        shutil.copyfile(matches[0], target)
+        return target
+
+
+def _cached_audio(cache_dir, video_id, mode):
+    if mode == "pcm":
+        path = os.path.join(cache_dir, f"{video_id}.pcm16k.npy")
+        return path if os.path.exists(path) else None
+    for path in glob.glob(os.path.join(cache_dir, f"{video_id}.*")):
+        if not path.endswith((".npy", ".part", ".ytdl")):
+            return path
+    return None
+
+
+def _video_lock(video_id):
+    with _download_locks_guard:
+        return _download_locks.setdefault(video_id, threading.Lock())
+
+
+def download_youtube_audio(url, mode="native", cache_dir=None, fetcher=None):
+    """Fetch the audio of a YouTube video, cached by video ID.
+
+    mode="native" keeps the original audio stream (no MP3 round trip);
+    mode="pcm" decodes once to 16 kHz mono float32 samples, which is exactly
+    what whisper consumes, and caches them as .npy.
+    """
+    if mode not in ("native", "pcm"):
+        raise ValueError(f"Unknown ingestion mode: {mode}")
+
+    cache_dir = cache_dir or YOUTUBE_CACHE_DIR
+    fetcher = fetcher or YtDlpFetcher()
+    os.makedirs(cache_dir, exist_ok=True)
+    video_id = youtube_video_id(url)
+
+    with _video_lock(video_id):
+        cached = _cached_audio(cache_dir, video_id, mode)
+        if cached:
+            return cached
+
+        native = _cached_audio(cache_dir, video_id, "native")
+        if not native:
+            # Each download gets its own directory; only the finished file is moved into the cache
+            work_dir = tempfile.mkdtemp(prefix=f"{video_id}-", dir=cache_dir)
+            try:
+                downloaded = fetcher.fetch(url, os.path.join(work_dir, video_id))
+                if not os.path.exists(downloaded):
+                    raise FileNotFoundError(f"Expected audio file not found: {downloaded}")
+                native = os.path.join(cache_dir, os.path.basename(downloaded))
+                os.replace(downloaded, native)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        if mode == "native":
+            return native
+
+        pcm_path = os.path.join(cache_dir, f"{video_id}.pcm16k.npy")
+        tmp_path = pcm_path + f".{os.getpid()}.tmp.npy"
+        np.save(tmp_path, whisper.load_audio(native))
+        os.replace(tmp_path, pcm_path)
+        return pcm_path
+
+
+def load_audio(audio_path):
+    """Load audio for whisper; cached 16 kHz PCM is memory-mapped instead of decoded again."""
+    if isinstance(audio_path, str) and audio_path.endswith(".npy"):
+        return np.load(audio_path, mmap_mode="r")
+    return audio_path
+
+
+def load_samples(audio_path):
+    """16 kHz mono float32 samples of an audio file; cached PCM is memory-mapped."""
+    audio = load_audio(audio_path)
+    if isinstance(audio, str):
+        return whisper.load_audio(audio)
+    return audio
+
+
+def iter_windows(samples, window_seconds=WINDOW_SECONDS, overlap_seconds=OVERLAP_SECONDS):
+    """Split samples into overlapping windows of `window_seconds` (views, not copies).
+
+    Yields (window, keep_from, keep_until): the seconds of the window whose
+    words belong to it. Each seam is cut at the middle of the overlap, so a
+    word spoken across a boundary is kept from the window that heard it
+    whole and dropped from the other.
+    """
+    rate = whisper.audio.SAMPLE_RATE
+    window = int(window_seconds * rate)
+    overlap = min(int(overlap_seconds * rate), window // 2)
+    step = window - overlap
+    half = overlap / 2 / rate
+    start = 0
+    while True:
+        last = start + window >= len(samples)
+        yield (samples[start:start + window],
+               half if start else 0.0,
+               None if last else window_seconds - half)
+        if last:
+            return
+        start += step
+
+
+def transcribe_window(samples, prompt=None, keep_from=0.0, keep_until=None):
+    """Transcribe one window; `prompt` (the previous window's text) keeps wording consistent.
+
+    Only words starting within [keep_from, keep_until) seconds are returned.
+    """
+    model = get_whisper("base")
+    result = model.transcribe(np.ascontiguousarray(samples, dtype=np.float32), initial_prompt=prompt,
+                              word_timestamps=True)
+    words = [
+        word["word"]
+        for segment in result["segments"]
+        for word in segment.get("words", ())
+        if word["start"] >= keep_from and (keep_until is None or word["start"] < keep_until)
+    ]
+    return "".join(words).strip()
 
-def download_youtube_audio(url, filename="youtube_audio"):
-    # Output template uses yt-dlp's dynamic extension feature
-    output_template = f"{filename}.%(ext)s"
-
-    ydl_opts = {
-        "format": "bestaudio/best",
-        "outtmpl": output_template,
-        "postprocessors": [{
-            "key": "FFmpegExtractAudio",
-            "preferredcodec": "mp3",
-            "preferredquality": "192",
-        }],
-        "quiet": True
-    }
-
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-
-    # We expect yt-dlp to convert and save as mp3
-    expected_file = f"{filename}.mp3"
-    if not os.path.exists(expected_file):
-        raise FileNotFoundError(f"Expected audio file not found: {expected_file}")
-    
-    return expected_file
 
 def transcribe_audio(audio_path):
-    model = whisper.load_model("base")  # Try 'medium' or 'large' if your laptop is made of dragon scales
-    result = model.transcribe(audio_path)
+    model = get_whisper("base")  # Try 'medium' or 'large' if your laptop is made of dragon scales
+    audio = load_audio(audio_path)
+    if isinstance(audio, np.ndarray):
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+    result = model.transcribe(audio)
     return result["text"]
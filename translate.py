@@ -1,19 +1,45 @@
-from transformers import MarianMTModel, MarianTokenizer
+from models import TRANSLATION_MODELS, get_translator
+from text_analysis import analyze
+from translation_memory import get_translation_memory, normalize_segment
 
-def translate_text(text, src_lang="en", tgt_lang="hi"):
-    model_name_map = {
-        "hi": "Helsinki-NLP/opus-mt-en-hi",
-        "fr": "Helsinki-NLP/opus-mt-en-fr",
-        "es": "Helsinki-NLP/opus-mt-en-es"
-    }
+BATCH_SIZE = 16
 
-    if tgt_lang not in model_name_map:
+def translate_text(text, src_lang="en", tgt_lang="hi", memory=None):
+    if tgt_lang not in TRANSLATION_MODELS:
         return text  # fallback to original
 
-    model_name = model_name_map[tgt_lang]
-    tokenizer = MarianTokenizer.from_pretrained(model_name)
-    model = MarianMTModel.from_pretrained(model_name)
+    # Translate sentence by sentence; sentences seen before come from the translation memory
+    analysis = analyze(text)
+    if not len(analysis):
+        return text
+    sentences = [normalize_segment(analysis.sentence(i)) for i in range(len(analysis))]
 
-    tokens = tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-    translated = model.generate(**tokens)
-    return tokenizer.decode(translated[0], skip_special_tokens=True)
+    model_name = TRANSLATION_MODELS[tgt_lang]
+    memory = memory or get_translation_memory()
+    translations = memory.lookup(src_lang, tgt_lang, model_name, sentences)
+
+    missing = [s for s in dict.fromkeys(sentences) if s not in translations]
+    if missing:
+        new = _translate_sentences(missing, tgt_lang)
+        memory.store(src_lang, tgt_lang, model_name, zip(missing, new))
+        translations.update(zip(missing, new))
+
+    # Keep the original line breaks and spacing between sentences
+    parts = []
+    end = 0
+    for i, sentence in enumerate(sentences):
+        start, next_end = analysis.span(i)
+        parts.append(text[end:start])
+        parts.append(translations[sentence])
+        end = next_end
+    parts.append(text[end:])
+    return "".join(parts)
+
+def _translate_sentences(sentences, tgt_lang):
+    tokenizer, model = get_translator(tgt_lang)
+    results = []
+    for i in range(0, len(sentences), BATCH_SIZE):
+        tokens = tokenizer(sentences[i:i + BATCH_SIZE], return_tensors="pt", padding=True, truncation=True)
+        translated = model.generate(**tokens)
+        results.extend(tokenizer.batch_decode(translated, skip_special_tokens=True))
+    return results
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+MEMORY_PATH = os.environ.get(
+    "SMARTCAST_TRANSLATION_MEMORY",
+    os.path.join(os.path.expanduser("~"), ".smartcast", "translation_memory.db"),
+)
+MAX_ENTRIES = int(os.environ.get("SMARTCAST_TRANSLATION_MEMORY_SIZE", "50000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    src_lang TEXT NOT NULL,
+    tgt_lang TEXT NOT NULL,
+    model TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_last_used ON segments(last_used);
+"""
+
+
+def normalize_segment(sentence: str) -> str:
+    """Canonical form of a source sentence: surrounding and repeated whitespace removed."""
+    return " ".join(sentence.split())
+
+
+def segment_key(src_lang: str, tgt_lang: str, model: str, sentence: str) -> str:
+    """Memory key for a normalized sentence under one language pair and model."""
+    raw = "\x1f".join((src_lang, tgt_lang, model, sentence))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Persistent sentence-level translation memory in SQLite.
+
+    Entries are keyed by (language pair, model, normalized sentence), so the
+    template passages every script shares are translated once and then served
+    from the memory. Each hit refreshes an entry; once the memory holds more
+    than `max_entries` sentences the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = MEMORY_PATH, max_entries: int = MAX_ENTRIES):
+        if path == ":memory:" or path.startswith("file::memory:"):
+            # Connections are per thread, so each thread would see its own empty memory
+            raise ValueError("TranslationMemory needs a database file; use a temporary path instead of :memory:")
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, src_lang: str, tgt_lang: str, model: str,
+               sentences: Iterable[str]) -> Dict[str, str]:
+        """Return the remembered translations of `sentences` (normalized source -> target)."""
+        keys = {segment_key(src_lang, tgt_lang, model, s): s for s in set(sentences)}
+        if not keys:
+            return {}
+
+        conn = self._connect()
+        found = {}
+        key_list = list(keys)
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(key_list), 500):
+            batch = key_list[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, target FROM segments WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            found.update((key, target) for key, target in rows)
+
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE segments SET hits = hits + 1, last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        return {keys[key]: target for key, target in found.items()}
+
+    def store(self, src_lang: str, tgt_lang: str, model: str, pairs: Iterable[Tuple[str, str]]):
+        """Remember (normalized source, translation) pairs, then evict down to `max_entries`."""
+        now = time.time()
+        rows = [(segment_key(src_lang, tgt_lang, model, source), src_lang, tgt_lang, model, source, target, now)
+                for source, target in pairs]
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments (key, src_lang, tgt_lang, model, source, target, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM segments WHERE key IN "
+                    "(SELECT key FROM segments ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+    def stats(self) -> Dict[str, int]:
+        entries, hits = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM segments"
+        ).fetchone()
+        return {"entries": entries, "hits": hits}
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_default_memory = None
+_default_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Return the process-wide translation memory at MEMORY_PATH."""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory()
+        return _default_memory
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+# Synthesized segments are stored here by content hash and shared by every episode
+TTS_CACHE_DIR = os.environ.get(
+    "SMARTCAST_TTS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "smartcast", "tts"),
+)
+
+# Byte budget of the cache; the least recently used segments are evicted beyond it
+MAX_BYTES = int(float(os.environ.get("SMARTCAST_TTS_CACHE_MB", "500")) * 1024 * 1024)
+
+
+def segment_key(text: str, lang: str, tld: str, backend: str) -> str:
+    """Content address of one synthesized segment."""
+    raw = "\x1f".join((backend, lang, tld, " ".join(text.split())))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SegmentCache:
+    """Content-addressed on-disk store of synthesized MP3 segments.
+
+    A segment is addressed by (text, language, voice/tld, backend), so the
+    template lines every script shares are synthesized once and then read
+    back from disk. Files are written to a temporary name and moved into
+    place, so concurrent writers never expose a partial segment.
+
+    A file's modification time records its last use (reads touch it). When
+    the segments on disk exceed `max_bytes`, the least recently used ones
+    are deleted down to 90% of the budget.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # bytes on disk, measured on the first write
+        self._lock = threading.Lock()  # guards the counters and the size
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(self.path(key))  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted by another process meanwhile
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(audio)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """(path, size, last used) of every segment on disk."""
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".mp3"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Rescan rather than trust the running total: other processes share the directory
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        target = int(self.max_bytes * 0.9)
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_segment_cache() -> SegmentCache:
+    """Return the process-wide segment cache at TTS_CACHE_DIR."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SegmentCache()
+        return _default_cache